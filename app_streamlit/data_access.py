@@ -0,0 +1,138 @@
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.normpath(os.path.join(APP_DIR, '..', 'models')))
+from scoring import load_scores, score_companies
+from status_rules import global_status, local_status
+
+# Data layer shared by all pages. Every loader is cached on the version of the file it reads
+# (modification time + size), so a widget interaction only pays a stat() and a cache lookup, and a new
+# scoring / training run is picked up without restarting the app. Frames from cache_resource are shared
+# between reruns and sessions: pages filter or copy them, never modify them in place.
+
+STORE_PATH = os.path.join(APP_DIR, "scores_store")
+CSV_PATH = os.path.join(APP_DIR, "dataset1_complet.csv")
+DATA_DIR = os.path.join(APP_DIR, "data")
+
+SCORES = ["profitability", "liquidity", "solvency", "leverage_adjusted"]
+STATUS_COLUMNS = ["company", "quarter", "revenue_growth"] + \
+    [f"score_{score}_local" for score in SCORES] + [f"score_{score}_global" for score in SCORES]
+
+
+def file_version(path):
+    # the scores store is versioned by its meta.json, written last
+    if os.path.isdir(path):
+        path = os.path.join(path, "meta.json")
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def scores_version():
+    return file_version(STORE_PATH) or file_version(CSV_PATH)
+
+
+@st.cache_data(show_spinner=False)
+def _load_scores(version, columns=None, companies=None):
+    return load_scores(STORE_PATH, columns and list(columns), companies and list(companies), CSV_PATH)
+
+
+def scores(columns=None, companies=None):
+    # columns / companies as tuples (hashable cache keys)
+    return _load_scores(scores_version(), columns, companies)
+
+
+@st.cache_data(show_spinner=False)
+def _companies(version):
+    return score_companies(STORE_PATH, CSV_PATH)
+
+
+def companies():
+    return _companies(scores_version())
+
+
+def compute_thresholds(df):
+    # 10th / 90th percentiles of every score over the whole panel, fixed bounds for revenue growth
+    thresholds_local, thresholds_global = {}, {}
+    for score in SCORES:
+        for thresholds, scope in [(thresholds_local, "local"), (thresholds_global, "global")]:
+            col = f"score_{score}_{scope}"
+            thresholds[f"score_{score}"] = {"low": df[col].quantile(0.1), "high": df[col].quantile(0.9)}
+    thresholds_local["revenue_growth"] = {"drop": -0.1, "boost": 0.1}
+    return thresholds_local, thresholds_global
+
+
+def get_local_alerts(row, thresholds_dynamic):
+    alerts = []
+    for score in SCORES:
+        val = row.get(f"score_{score}_local")
+        if pd.notna(val):
+            threshold_key = f"score_{score}"
+            if val > thresholds_dynamic[threshold_key]["high"]:
+                alerts.append(f"↑ {score.title()}")
+            elif val < thresholds_dynamic[threshold_key]["low"]:
+                alerts.append(f"↓ {score.title()}")
+    rev = row.get("revenue_growth")
+    if pd.notna(rev):
+        if rev > thresholds_dynamic["revenue_growth"]["boost"]:
+            alerts.append("Rev ↑")
+        elif rev < thresholds_dynamic["revenue_growth"]["drop"]:
+            alerts.append("Rev ↓")
+    return ", ".join(alerts)
+
+
+def get_global_alerts(row, thresholds_dynamic_global):
+    alerts = []
+    for score in SCORES:
+        val = row.get(f"score_{score}_global")
+        if pd.notna(val):
+            threshold_key = f"score_{score}"
+            if val > thresholds_dynamic_global[threshold_key]["high"]:
+                alerts.append(f"High {score.title()}")
+            elif val < thresholds_dynamic_global[threshold_key]["low"]:
+                alerts.append(f"Low {score.title()}")
+    return ", ".join(alerts)
+
+
+def format_percentage(x):
+    try:
+        return f"{x*100:.1f}%" if pd.notna(x) else ""
+    except:
+        return x
+
+
+@st.cache_resource(show_spinner=False)
+def _status_frame(version):
+    df = load_scores(STORE_PATH, STATUS_COLUMNS, csv_path=CSV_PATH)
+    df = df.sort_values(["company", "quarter"])
+    thresholds_local, thresholds_global = compute_thresholds(df)
+    df["Local Alert Summary"] = df.apply(get_local_alerts, axis=1, args=(thresholds_local,))
+    df["Global Alert Summary"] = df.apply(get_global_alerts, axis=1, args=(thresholds_global,))
+    df["Local Status"] = local_status(df, thresholds_local)
+    df["Global Status"] = global_status(df, thresholds_global)
+    df["Rev Growth"] = df["revenue_growth"].apply(format_percentage)
+    return df, thresholds_local, thresholds_global
+
+
+def status_frame():
+    # scores + alerts + statuses of pages 2 and 3, computed once per version of the scores
+    return _status_frame(scores_version())
+
+
+@st.cache_data(show_spinner=False)
+def _read_csv(path, version, parse_dates=None):
+    return pd.read_csv(path, parse_dates=parse_dates)
+
+
+def read_data_csv(file_name, parse_dates=None):
+    # outputs of the model scripts in app_streamlit/data (anomaly results, healthy periods, latent map)
+    path = os.path.join(DATA_DIR, file_name)
+    version = file_version(path)
+    if version is None:
+        return None
+    return _read_csv(path, version, parse_dates)
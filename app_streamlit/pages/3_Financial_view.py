@@ -1,156 +1,16 @@
-import pandas as pd
 import streamlit as st
 import os
+import sys
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.normpath(os.path.join(current_dir, '..', 'dataset1_complet.csv'))
-df = pd.read_csv(csv_path)
-df = df.sort_values(["company", "quarter"])
-
-# dynamic thresholds (percentiles)
-thresholds_dynamic = {}
-score_cols = ["score_profitability_local", "score_liquidity_local", "score_solvency_local", "score_leverage_adjusted_local"]
-
-for col in score_cols:
-    low = df[col].quantile(0.1)
-    high = df[col].quantile(0.9)
-    thresholds_dynamic[col.replace("_local", "")] = {"low": low, "high": high}
-
-# fixed treshold for revenue growth
-thresholds_dynamic["revenue_growth"] = {"drop": -0.1, "boost": 0.1}
-
-
-thresholds_dynamic_global = {}
-score_cols_global = ["score_profitability_global", "score_liquidity_global", "score_solvency_global", "score_leverage_adjusted_global"]
-
-for col in score_cols_global:
-    low = df[col].quantile(0.1)
-    high = df[col].quantile(0.9)
-    thresholds_dynamic_global[col.replace("_global", "")] = {"low": low, "high": high}
-
-
-def get_local_alerts(row):
-    alerts = []
-    for score in ["profitability", "liquidity", "solvency", "leverage_adjusted"]:
-        val = row.get(f"score_{score}_local")
-        if pd.notna(val):
-            threshold_key = f"score_{score}"  
-            if val > thresholds_dynamic[threshold_key]["high"]:
-                alerts.append(f"↑ {score.title()}")
-            elif val < thresholds_dynamic[threshold_key]["low"]:
-                alerts.append(f"↓ {score.title()}")
-    rev = row.get("revenue_growth")
-    if pd.notna(rev):
-        if rev > thresholds_dynamic["revenue_growth"]["boost"]:
-            alerts.append("Rev ↑")
-        elif rev < thresholds_dynamic["revenue_growth"]["drop"]:
-            alerts.append("Rev ↓")
-    return ", ".join(alerts)
-
-
-def get_global_alerts(row):
-    alerts = []
-    for score in ["profitability", "liquidity", "solvency", "leverage_adjusted"]:
-        val = row.get(f"score_{score}_global")
-        if pd.notna(val):
-            threshold_key = f"score_{score}"  
-            if val > thresholds_dynamic_global[threshold_key]["high"]:
-                alerts.append(f"High {score.title()}")
-            elif val < thresholds_dynamic_global[threshold_key]["low"]:
-                alerts.append(f"Low {score.title()}")
-    return ", ".join(alerts)
-
-
-def get_local_status(row):
-    red, green = 0, 0
-    indicators = {
-        "score_profitability": row.get("score_profitability_local"),
-        "score_liquidity": row.get("score_liquidity_local"),
-        "score_solvency": row.get("score_solvency_local"),
-        "score_leverage_adjusted": row.get("score_leverage_adjusted_local")
-    }
+sys.path.append(os.path.normpath(os.path.join(current_dir, '..')))
+import data_access
+from data_access import format_percentage
 
-    available = [val for val in indicators.values() if pd.notna(val)]
-    if len(available) < 3:
-        return "Insufficient Data"
-
-    for key, value in indicators.items():
-        if pd.notna(value):
-            if value < thresholds_dynamic[key]["low"]:
-                red += 1
-            elif value > thresholds_dynamic[key]["high"]:
-                green += 1
-
-    adj_leverage = indicators["score_leverage_adjusted"]
-    rev = row.get("revenue_growth")
-
-    if adj_leverage is not None and adj_leverage < thresholds_dynamic["score_leverage_adjusted"]["low"]:
-        return "Leveraged Risk"
-    elif adj_leverage is not None and adj_leverage > thresholds_dynamic["score_leverage_adjusted"]["high"] and red == 0 and rev is not None and rev > thresholds_dynamic["revenue_growth"]["boost"]:
-        return "Excellent Health"
-    elif red >= 3:
-        return "Critical Risk"
-    elif red == 2:
-        return "Danger"
-    elif green >= 2 and red == 0:
-        return "Strong"
-    elif green > 0 and red == 0:
-        return "Good signal"
-    elif red == green and red > 0:
-        return "Mixed Risk"
-    elif red == 1 and green == 0:
-        return "Caution"
-    elif all(thresholds_dynamic[k]["low"] <= val <= thresholds_dynamic[k]["high"] for k, val in indicators.items() if pd.notna(val)):
-        return "Stable"
-    else:
-        return "Watch"
-
-
-def get_global_status(row):
-    red, green = 0, 0
-    indicators = {
-        "score_profitability": row.get("score_profitability_global"),
-        "score_liquidity": row.get("score_liquidity_global"),
-        "score_solvency": row.get("score_solvency_global"),
-        "score_leverage_adjusted": row.get("score_leverage_adjusted_global")
-    }
+# scores, thresholds, alerts and statuses are computed once per version of the data (data_access.py)
+df, thresholds_dynamic, thresholds_dynamic_global = data_access.status_frame()
 
-    available = [val for val in indicators.values() if pd.notna(val)]
-    if len(available) < 3:
-        return "Insufficient Data"
-
-    for key, value in indicators.items():
-        if pd.notna(value):
-            if value < thresholds_dynamic_global[key]["low"]:
-                red += 1
-            elif value > thresholds_dynamic_global[key]["high"]:
-                green += 1
-
-    if red >= 3:
-        return "Critical Risk"
-    elif red == 2:
-        return "Danger"
-    elif green >= 2 and red == 0:
-        return "Strong"
-    elif green > 0 and red == 0:
-        return "Good signal"
-    elif red == green and red > 0:
-        return "Mixed Risk"
-    elif red == 1 and green == 0:
-        return "Caution"
-    elif all(thresholds_dynamic_global[k]["low"] <= val <= thresholds_dynamic_global[k]["high"] for k, val in indicators.items() if pd.notna(val)):
-        return "Stable"
-    else:
-        return "Watch"
-
-
-
-def format_percentage(x):
-    try:
-        return f"{x*100:.1f}%" if pd.notna(x) else ""
-    except:
-        return x
 
 def color_local_status(val):
     colors = {
@@ -167,13 +27,6 @@ def color_local_status(val):
     }
     return f"background-color: {colors.get(val, '')}"
 
-# compute scores and format ===
-df["Local Alert Summary"] = df.apply(get_local_alerts, axis=1)
-df["Global Alert Summary"] = df.apply(get_global_alerts, axis=1)
-df["Local Status"] = df.apply(get_local_status, axis=1)
-df["Global Status"] = df.apply(get_global_status, axis=1)
-
-df["Rev Growth"] = df["revenue_growth"].apply(format_percentage)
 
 
 st.title("Company Financial Score Dashboard")
@@ -2,17 +2,11 @@ import streamlit as st
 import pandas as pd
 import os
 import altair as alt
+import sys
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.normpath(os.path.join(current_dir, '..', 'dataset1_complet.csv'))
-
-@st.cache_data
-def load_data():
-    df = pd.read_csv(csv_path)
-    df = df.sort_values(["company", "quarter"])
-    return df
-
-df = load_data()
+sys.path.append(os.path.normpath(os.path.join(current_dir, '..')))
+import data_access
 
 st.title("Score Evolution Explorer")
 st.markdown("""
@@ -49,7 +43,7 @@ macro_options = {
 
 selected_companies = st.multiselect(
     "Select companies to compare:",
-    options=sorted(df["company"].unique())
+    options=data_access.companies()
 )
 
 selected_labels = st.multiselect(
@@ -69,6 +63,9 @@ if selected_companies and selected_labels:
 
     selected_columns = [score_options[label] for label in selected_labels]
     macro_columns = [macro_options[m] for m in selected_macro]
+    # only the selected companies and indicators are read from the scores store
+    df = data_access.scores(tuple(["company", "quarter"] + selected_columns + macro_columns), tuple(selected_companies))
+    df = df.sort_values(["company", "quarter"])
 
     def prepare_plot_data(df_src, label):
         all_quarters = df["quarter"].sort_values().unique()
@@ -65,6 +65,11 @@ By doing this, we exclude periods affected by crises, unusual events, or extreme
 This ensures that our AI models learn only from typical financial behavior,
 making them much better at spotting what’s truly unusual later on.
 
+Two alternative rules can be selected at training time: a **rolling median absolute deviation** filter
+(quarters far from the bank's recent typical level are excluded) and a **macro-conditioned** filter
+(the percentile box, minus quarters with extreme GDP growth or interest rates).
+The healthy quarters actually used can be displayed on the anomaly page.
+
 
 """)
 
@@ -3,6 +3,14 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.normpath(os.path.join(current_dir, '..')))
+import data_access
+from bank_events import BANK_EVENTS
+from group_models import GROUP_TARGETS
+from model_registry import company_slug
 
 st.title(" Anomalies detected by AutoEncoder")
 
@@ -48,83 +56,23 @@ Use the table below the chart to explore individual anomaly details and related
 
 
 
-BANK_FILES = {
-    "JP Morgan Chase": "anomaly_results_jpm.csv",
-    "Banco Santander": "anomaly_results_banco.csv",
-    "BNP Paribas": "anomaly_results_bnp_paribas.csv",
-    "Crédit Agricole": "anomaly_results_crédit_agricole.csv",
-    "HSBC": "anomaly_results_hsbc.csv"
-}
+BANKS = ["JP Morgan Chase", "Banco Santander", "BNP Paribas", "Crédit Agricole", "HSBC"]
+# same names as models/train_all.py writes
+BANK_FILES = {bank: f"anomaly_results_{company_slug(bank)}.csv" for bank in BANKS}
 
 
 
-BANK_EVENTS = {
-    # JP Morgan Chase
-    "JP Morgan Chase": pd.DataFrame([
-        {"date":"2012-07-01", "event":"London Whale", "target":"profitability"},
-        {"date":"2013-07-01", "event":"$13B DOJ subprime", "target":"profitability/solvency/leverage/liquidity"},
-        {"date":"2019-09-17", "event":"Tensions repo US", "target":"liquidity"},
-        {"date":"2020-03-31", "event":"COVID-19", "target":"profitability/liquidity/growth"},
-        {"date":"2021-01-15", "event":"Record $12.1B Q4 profit", "target":"profitability"},
-        {"date":"2023-03-15", "event":"SVB crisis", "target":"solvency/liquidity"},
-        {"date":"2025-01-14", "event":"Whistleblower", "target":"solvency/profitability/leverage"},
-        {"date":"2025-06-21", "event":"Directive FDIC", "target":"liquidity"},
-    ]),
-    
-    # Banco Santander
-    "Banco Santander": pd.DataFrame([
-        {"date":"2008-10-01", "event":"Acquisition of Sovereign Bank", "target":"growth"},
-        {"date":"2012-06-01", "event":"Spain banking crisis bailout", "target":"solvency/liquidity"},
-        {"date":"2015-01-08", "event":"€7.5B capital increase", "target":"solvency/leverage"},
-        {"date":"2017-06-07", "event":"Acquisition of Banco Popular", "target":"growth/solvency"},
-        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/solvency"},
-        {"date":"2023-03-15", "event":"SVB crisis exposure concerns", "target":"liquidity"},
-    ]),
-    
-    # BNP Paribas
-    "BNP Paribas": pd.DataFrame([
-        {"date":"2008-10-01", "event":"Financial crisis impact", "target":"liquidity/solvency"},
-        {"date":"2014-06-30", "event":"$8.9B US sanctions fine", "target":"profitability/solvency"},
-        {"date":"2016-07-01", "event":"Restructuring of Corporate & Institutional Banking", "target":"profitability"},
-        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/liquidity"},
-        {"date":"2022-01-01", "event":"Sale of US retail bank", "target":"liquidity/profitability"},
-        {"date":"2023-03-15", "event":"SVB crisis market volatility", "target":"liquidity"},
-    ]),
-    
-    # Crédit Agricole
-    "Crédit Agricole": pd.DataFrame([
-        {"date":"2008-10-01", "event":"Global financial crisis", "target":"solvency/liquidity"},
-        {"date":"2011-11-01", "event":"Greek debt exposure losses", "target":"solvency/profitability"},
-        {"date":"2016-02-01", "event":"Exit from Emporiki Bank Greece", "target":"growth/solvency"},
-        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/liquidity"},
-        {"date":"2021-06-01", "event":"Acquisition of Creval in Italy", "target":"growth"},
-        {"date":"2023-03-15", "event":"SVB crisis impact", "target":"liquidity"},
-    ]),
-    
-    # HSBC
-    "HSBC": pd.DataFrame([
-        {"date":"2008-03-01", "event":"Subprime crisis losses", "target":"profitability/solvency"},
-        {"date":"2012-12-11", "event":"$1.9B US money laundering fine", "target":"profitability/solvency"},
-        {"date":"2015-06-01", "event":"Global restructuring announced", "target":"profitability/leverage"},
-        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/liquidity"},
-        {"date":"2021-02-23", "event":"Pivot to Asia strategy", "target":"growth/solvency"},
-        {"date":"2023-03-15", "event":"SVB crisis UK acquisition", "target":"liquidity/growth"},
-    ])
-}
-
 scores = ["profitability", "liquidity", "solvency", "leverage"]
 
 
 bank_name = st.selectbox("Select a bank :", list(BANK_FILES.keys()))
 
 
-@st.cache_data
 def load_anomaly_data(bank_file):
-    file_path = os.path.join("data", bank_file)
-    if not os.path.exists(file_path):
+    # cached by data_access until the training scripts rewrite the file
+    df = data_access.read_data_csv(bank_file, parse_dates=["date"])
+    if df is None:
         st.error(f" folder '{bank_file}' not available")
-        return None
-    df = pd.read_csv(file_path, parse_dates=["date"])
     return df
 
 df = load_anomaly_data(BANK_FILES[bank_name])
@@ -139,9 +87,10 @@ def classify_anomalies(df, score_name, delta_col):
     nature_col = f"anomaly_nature_{score_name}"
     if delta_col not in df.columns or anomaly_col not in df.columns:
         return df
+    # delta = change since the previous quarter (models/anomaly_pipeline.add_deltas): a rising score is good
     df[nature_col] = "none"
-    df.loc[df[anomaly_col] & (df[delta_col] > 0), nature_col] = "bad"
-    df.loc[df[anomaly_col] & (df[delta_col] < 0), nature_col] = "good"
+    df.loc[df[anomaly_col] & (df[delta_col] > 0), nature_col] = "good"
+    df.loc[df[anomaly_col] & (df[delta_col] < 0), nature_col] = "bad"
     return df
 
 
@@ -154,16 +103,14 @@ for score in scores:
 selected_score = st.selectbox(" Select an indicator :", scores)
 
 
-@st.cache_data
-def load_macro_data():
-    file_path = os.path.join( "dataset1_complet.csv")
-    if not os.path.exists(file_path):
+def load_macro_data(company):
+    # the three macro columns of the selected bank only, from the scores store (models/scoring.py) or the CSV export
+    if data_access.scores_version() is None:
         st.error(" Fichier macroéconomique introuvable.")
         return None
-    df_macro = pd.read_csv(file_path, parse_dates=["date"])
-    return df_macro
+    return data_access.scores(("company", "date", "inflation_YoY", "gdp_growth_rate", "interest_rate"), (company,))
 
-macro_df = load_macro_data()
+macro_df = load_macro_data(bank_name)
 if macro_df is not None:
     
     macro_bank_df = macro_df[macro_df["company"].str.contains(bank_name, case=False, na=False)].copy()
@@ -186,7 +133,12 @@ else:
     selected_macro_var = "Nothing"
 
 
-def plot_anomalies(df, score_name, company, macro_df=None, macro_var=None):
+# written by models/train_all.py next to the anomaly results: the quarters each model was trained on
+healthy_df = data_access.read_data_csv("healthy_periods.csv", parse_dates=["date"])
+show_healthy = healthy_df is not None and st.checkbox("Show healthy (training) periods", value=False)
+
+
+def plot_anomalies(df, score_name, company, macro_df=None, macro_var=None, healthy_df=None, event_target=None):
     err_col = f"reconstruction_error_{score_name}"
     anomaly_nature_col = f"anomaly_nature_{score_name}"
     threshold_col = f"threshold_{score_name}"
@@ -197,6 +149,18 @@ def plot_anomalies(df, score_name, company, macro_df=None, macro_var=None):
     fig, ax1 = plt.subplots(figsize=(14, 5))
     ax1.plot(df_c["date"], df_c[err_col], label="Reconstruction Error", color="gray")
 
+    # seed-ensemble results (train_all.py --ensemble K): mean error +/- one std across members
+    std_col = f"reconstruction_error_std_{score_name}"
+    if std_col in df_c.columns:
+        ax1.fill_between(df_c["date"], (df_c[err_col] - df_c[std_col]).clip(lower=0), df_c[err_col] + df_c[std_col],
+                         color="gray", alpha=0.25, label="Ensemble spread (±1 std)")
+
+    healthy_col = f"healthy_{score_name}"
+    if healthy_df is not None and healthy_col in healthy_df.columns:
+        healthy_c = healthy_df[healthy_df["company"].str.contains(company, case=False, na=False)].sort_values("date")
+        ax1.fill_between(healthy_c["date"], 0, 1, where=healthy_c[healthy_col], step="mid", color="green", alpha=0.08,
+                         transform=ax1.get_xaxis_transform(), label="Healthy period")
+
     if threshold_col in df_c.columns:
         ax1.axhline(df_c[threshold_col].iloc[0], color="blue", linestyle="--", label="Threshold")
 
@@ -224,9 +188,10 @@ def plot_anomalies(df, score_name, company, macro_df=None, macro_var=None):
     
     events_df = BANK_EVENTS.get(company)
     if events_df is not None:
-        events_df = events_df[pd.to_datetime(events_df["date"]) >= df_c["date"].min()]
+        # copy: BANK_EVENTS frames are shared by every page and rerun
+        events_df = events_df[pd.to_datetime(events_df["date"]) >= df_c["date"].min()].copy()
         events_df["date"] = pd.to_datetime(events_df["date"])
-        for _, row in events_df[events_df["target"].str.contains(score_name.lower())].iterrows():
+        for _, row in events_df[events_df["target"].str.contains((event_target or score_name).lower())].iterrows():
             ax1.axvline(row["date"], color='purple', linestyle=':', alpha=0.7)
             ax1.text(row["date"], ax1.get_ylim()[1]*0.95, row["event"],
                      rotation=90, fontsize=8, color='purple', verticalalignment='top')
@@ -252,7 +217,27 @@ def plot_anomalies(df, score_name, company, macro_df=None, macro_var=None):
 
 
 
-plot_anomalies(df, selected_score, bank_name, macro_bank_df if selected_macro_var != "Aucune" else None, selected_macro_var)
+plot_anomalies(df, selected_score, bank_name, macro_bank_df if selected_macro_var != "Aucune" else None, selected_macro_var,
+               healthy_df if show_healthy else None)
+
+
+# === Raw-ratio group models (models/group_models.py) ===
+# indicator -> group of raw ratios covering it (group -> BANK_EVENTS target: group_models.GROUP_TARGETS)
+SCORE_GROUPS = {"profitability": "rentabilité", "liquidity": "liquidité", "solvency": "solvabilité", "leverage": "solvabilité"}
+
+# same name as group_models.train_groups writes
+groups_file = f"anomaly_results_groups_{company_slug(bank_name)}.csv"
+if os.path.exists(os.path.join(data_access.DATA_DIR, groups_file)) and st.checkbox("Compare with raw-ratio group models", value=False):
+    df_groups = load_anomaly_data(groups_file)
+    group = SCORE_GROUPS[selected_score]
+    df_groups = classify_anomalies(df_groups, group, f"delta_{group}")
+    plot_anomalies(df_groups, group, bank_name, event_target=GROUP_TARGETS[group])
+
+    flagged_scores = set(df.loc[df[f"is_anomaly_{selected_score}"], "date"])
+    flagged_groups = set(df_groups.loc[df_groups[f"is_anomaly_{group}"], "date"])
+    st.caption(f"{len(flagged_scores & flagged_groups)} quarters flagged by both models, "
+               f"{len(flagged_scores - flagged_groups)} only by the {selected_score} score model, "
+               f"{len(flagged_groups - flagged_scores)} only by the {group} ratio model.")
 
 
 # === Table of anomalies with event context ===
@@ -277,6 +262,7 @@ if selected_nature != "all":
 # Add nearby events (±1 quarter = ~90 days)
 events_df = BANK_EVENTS.get(bank_name)
 if events_df is not None:
+    events_df = events_df.copy()
     events_df["date"] = pd.to_datetime(events_df["date"])
     events_df_score = events_df[events_df["target"].str.contains(selected_score.lower(), na=False)]
 
@@ -295,9 +281,19 @@ else:
 
 # Simplify column names for display
 columns_to_display = ["date", f"reconstruction_error_{selected_score}", delta_col, nature_col, "event"]
+
+# share of the error coming from the score level vs its quarterly change (stored by the training pipeline)
+level_col = f"contribution_score_{selected_score}"
+if level_col in df_anomalies.columns:
+    df_anomalies["level_share"] = (df_anomalies[level_col] / df_anomalies[f"reconstruction_error_{selected_score}"]).round(2)
+    df_anomalies["driver"] = df_anomalies["level_share"].map(lambda share: "level" if share >= 0.5 else "change")
+    columns_to_display[2:2] = ["driver", "level_share"]
+
 df_anomalies_display = df_anomalies[columns_to_display].rename(columns={
     "date": "Date",
     f"reconstruction_error_{selected_score}": "Error",
+    "driver": "Driver",
+    "level_share": "Level share",
     delta_col: "Δ Score",
     nature_col: "Type",
     "event": "Nearby Event"
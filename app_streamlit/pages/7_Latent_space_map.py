@@ -0,0 +1,86 @@
+import streamlit as st
+import altair as alt
+import os
+import sys
+
+sys.path.append(os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import data_access
+
+st.title(" Latent space map")
+
+st.markdown("""
+Each AutoEncoder compresses a quarter into a small **code** (its bottleneck: 2 dimensions, 4 for the joint models).
+This map places every quarter of every bank at its code: quarters the model finds normal gather together,
+anomalies tend to sit apart.""")
+with st.expander("How to use this page"):
+    st.markdown("""
+    - Select a model (one per indicator, windowed `_w` or joint models when they were trained).
+    For the joint models, choose which two of the four code dimensions to draw.
+
+    - **Density** view: all quarters of the selected banks, as a grid; darker cells hold more quarters, red dots are anomalies.
+
+    - **Quarters** view: individual quarters colored by anomaly flag (all anomalies + a sample of normal quarters).
+
+    The layers are precomputed by `models/latent_map.py`, so the page only draws small tables.
+    """)
+
+
+points = data_access.read_data_csv("latent_points.csv", parse_dates=["date"])
+density = data_access.read_data_csv("latent_density.csv")
+if points is None or density is None:
+    st.error(" Latent map not available: run models/latent_map.py first.")
+    st.stop()
+
+
+selected_model = st.selectbox("Select a model :", sorted(points["indicator"].unique()))
+banks = sorted(points["company"].unique())
+selected_banks = st.multiselect("Select banks :", banks, default=banks)
+view = st.radio("View :", ["Density (all quarters)", "Quarters (sampled)"], horizontal=True)
+
+points_model = points[(points["indicator"] == selected_model) & points["company"].isin(selected_banks)]
+
+# the code dimensions of the model (the columns of larger codes are empty for the others)
+dims = [column for column in points.columns if column.startswith("latent")
+        and points.loc[points["indicator"] == selected_model, column].notna().all()]
+if len(dims) > 2:
+    col_x, col_y = st.columns(2)
+    x_dim = col_x.selectbox("Horizontal axis :", dims, index=0)
+    y_dim = col_y.selectbox("Vertical axis :", [dim for dim in dims if dim != x_dim], index=0)
+    st.caption(f"This model's code has {len(dims)} dimensions: the map shows {x_dim} and {y_dim}.")
+else:
+    x_dim, y_dim = "latent1", "latent2"
+x_title, y_title = x_dim.replace("latent", "Latent "), y_dim.replace("latent", "Latent ")
+tooltip = ["company", alt.Tooltip("date:T", format="%Y-%m-%d"), alt.Tooltip("reconstruction_error:Q", format=".3f")]
+
+if view.startswith("Density"):
+    # the grid is stored per bank (shared cell edges): add up the cells of the selected banks;
+    # a pair is stored once, (latent1, latent3) and not (latent3, latent1)
+    pair = sorted([x_dim, y_dim])
+    density_model = density[(density["indicator"] == selected_model) & (density["x_dim"] == pair[0])
+                            & (density["y_dim"] == pair[1]) & density["company"].isin(selected_banks)]
+    cells = density_model.groupby(["x0", "x1", "y0", "y1"], as_index=False)[["count", "anomalies"]].sum()
+    if pair != [x_dim, y_dim]:
+        cells = cells.rename(columns={"x0": "y0", "x1": "y1", "y0": "x0", "y1": "x1"})
+    grid = alt.Chart(cells).mark_rect().encode(
+        x=alt.X("x0:Q", title=x_title), x2="x1",
+        y=alt.Y("y0:Q", title=y_title), y2="y1",
+        color=alt.Color("count:Q", scale=alt.Scale(scheme="greys"), title="Quarters"),
+        tooltip=["count", "anomalies"]
+    )
+    anomalies = alt.Chart(points_model[points_model["is_anomaly"]]).mark_circle(color="red", size=30).encode(
+        x=f"{x_dim}:Q", y=f"{y_dim}:Q", tooltip=tooltip
+    )
+    chart = grid + anomalies
+else:
+    chart = alt.Chart(points_model).mark_circle(size=40, opacity=0.7).encode(
+        x=alt.X(f"{x_dim}:Q", title=x_title),
+        y=alt.Y(f"{y_dim}:Q", title=y_title),
+        color=alt.Color("is_anomaly:N", scale=alt.Scale(domain=[False, True], range=["lightgray", "red"]),
+                        title="Anomaly"),
+        shape=alt.Shape("company:N", title="Bank"),
+        tooltip=tooltip
+    )
+
+st.altair_chart(chart.properties(height=550).interactive(), use_container_width=True)
+
+st.caption(f"{len(points_model)} quarters drawn, {int(points_model['is_anomaly'].sum())} anomalies.")
@@ -0,0 +1,82 @@
+import operator
+
+import numpy as np
+
+# Local / global status of a quarter, declared once as ordered rules: the first rule whose conditions all
+# hold gives the status, "Watch" otherwise. A condition compares a per-row feature with a number or with
+# another feature. The rules are compiled into numpy.select over whole columns (instead of the row-by-row
+# if/elif chains of pages 2 and 3); tests/test_status_rules.py checks that both give the same statuses.
+#
+# Features of a row, over the four scores of one scope (local or global):
+#   available      number of scores present
+#   red / green    scores below their low threshold / above their high threshold
+#   within         every present score between its thresholds
+#   leverage_low / leverage_high   adjusted leverage below its low / above its high threshold
+#   revenue_boost  revenue growth above its "boost" threshold (local thresholds only)
+
+SCORES = ["profitability", "liquidity", "solvency", "leverage_adjusted"]
+
+LOCAL_RULES = [
+    ("Insufficient Data", [("available", "<", 3)]),
+    ("Leveraged Risk", [("leverage_low", "==", True)]),
+    ("Excellent Health", [("leverage_high", "==", True), ("red", "==", 0), ("revenue_boost", "==", True)]),
+    ("Critical Risk", [("red", ">=", 3)]),
+    ("Danger", [("red", "==", 2)]),
+    ("Strong", [("green", ">=", 2), ("red", "==", 0)]),
+    ("Good signal", [("green", ">", 0), ("red", "==", 0)]),
+    ("Mixed Risk", [("red", "==", "green"), ("red", ">", 0)]),
+    ("Caution", [("red", "==", 1), ("green", "==", 0)]),
+    ("Stable", [("within", "==", True)])
+]
+# the global status has no leverage / revenue rules
+GLOBAL_RULES = [rule for rule in LOCAL_RULES if rule[0] not in ("Leveraged Risk", "Excellent Health")]
+DEFAULT_STATUS = "Watch"
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, "==": operator.eq, ">=": operator.ge, ">": operator.gt}
+
+
+def compile_rules(rules, default=DEFAULT_STATUS):
+    # resolve the operators once; the returned function evaluates every rule as one boolean mask per column set
+    compiled = [(status, [(feature, OPERATORS[op], value) for feature, op, value in conditions])
+                for status, conditions in rules]
+
+    def evaluate(features):
+        masks = []
+        for _, conditions in compiled:
+            mask = np.ones(len(features["available"]), dtype=bool)
+            for feature, op, value in conditions:
+                mask &= op(features[feature], features[value] if isinstance(value, str) else value)
+            masks.append(mask)
+        return np.select(masks, [status for status, _ in compiled], default=default)
+
+    return evaluate
+
+
+def rule_features(df, scope, thresholds):
+    values = df[[f"score_{score}_{scope}" for score in SCORES]].to_numpy(dtype=float)
+    low = np.array([thresholds[f"score_{score}"]["low"] for score in SCORES], dtype=float)
+    high = np.array([thresholds[f"score_{score}"]["high"] for score in SCORES], dtype=float)
+    present = ~np.isnan(values)
+    features = {
+        "available": present.sum(axis=1),
+        "red": (values < low).sum(axis=1),
+        "green": (values > high).sum(axis=1),
+        "within": (((values >= low) & (values <= high)) | ~present).all(axis=1),
+        "leverage_low": values[:, -1] < low[-1],
+        "leverage_high": values[:, -1] > high[-1]
+    }
+    if "revenue_growth" in thresholds:
+        features["revenue_boost"] = df["revenue_growth"].to_numpy(dtype=float) > thresholds["revenue_growth"]["boost"]
+    return features
+
+
+local_rules = compile_rules(LOCAL_RULES)
+global_rules = compile_rules(GLOBAL_RULES)
+
+
+def local_status(df, thresholds_local):
+    return local_rules(rule_features(df, "local", thresholds_local))
+
+
+def global_status(df, thresholds_global):
+    return global_rules(rule_features(df, "global", thresholds_global))
@@ -0,0 +1,490 @@
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
+import numpy as np
+import pandas as pd
+import time
+from functools import reduce
+from numpy.lib.stride_tricks import sliding_window_view
+
+from model_registry import ModelRegistry
+from npz_model import forward, forward_with_code
+from training_cache import TrainingCache, training_key
+
+
+FEATURES_BY_SCORE = {
+    "profitability": ["score_profitability_local", "delta_profitability"],
+    "liquidity": ["score_liquidity_local", "delta_liquidity"],
+    "solvency": ["score_solvency_local", "delta_solvency"],
+    "leverage": ["score_leverage_adjusted_local", "delta_leverage"]
+}
+
+# joint mode: a single model per bank over the 8 score/delta features of all indicators
+JOINT = "joint"
+JOINT_FEATURES = [col for cols in FEATURES_BY_SCORE.values() for col in cols]
+
+
+def add_deltas(df_company):
+    # oldest quarter first (dataset1_complet.csv lists the newest first): delta = change since the previous quarter,
+    # as feature_store.build_features computes it
+    df_company = df_company.assign(date=pd.to_datetime(df_company["date"])).sort_values("date", kind="stable")
+    for score_col, delta_col in FEATURES_BY_SCORE.values():
+        df_company[delta_col] = df_company[score_col].diff()
+    df_company.fillna(0, inplace=True)
+    return df_company
+
+
+def load_company(df, company):
+    df_company = df[df["company"] == company]
+    # frames read from the feature store already carry the deltas
+    if all(delta_col in df.columns for _, delta_col in FEATURES_BY_SCORE.values()):
+        return df_company.sort_values("date", key=pd.to_datetime, kind="stable")
+    return add_deltas(df_company)
+
+
+# epochs is an upper bound: training stops once the validation loss has not improved for `patience` epochs.
+# batch_size=None picks it from the number of healthy quarters (adaptive_batch_size)
+HYPERPARAMS = {"encoding_dim": 2, "epochs": 100, "batch_size": None, "learning_rate": 0.001,
+               "patience": 10, "restore_best_weights": True}
+JOINT_HYPERPARAMS = dict(HYPERPARAMS, encoding_dim=4)
+
+# windowed mode: number of past quarters (current one included) fed to each indicator's model
+WINDOWS = {"profitability": 4, "liquidity": 4, "solvency": 4, "leverage": 4}
+
+
+def adaptive_batch_size(n_rows, target_steps=8, min_size=4, max_size=32):
+    # about target_steps gradient steps per epoch, whatever the length of the healthy history
+    return int(np.clip(np.ceil(n_rows / target_steps), min_size, max_size))
+
+
+def train_autoencoder(X_train, encoding_dim=2, epochs=100, batch_size=8, X_val=None, learning_rate=0.001, seed=None,
+                      patience=None, restore_best_weights=True):
+    # keras is imported here so that worker processes can pin TensorFlow threads before the import
+    import keras
+    from keras.models import Model
+    from keras.layers import Input, Dense
+    from keras.optimizers import Adam
+    from keras.callbacks import EarlyStopping
+
+    if seed is not None:
+        keras.utils.set_random_seed(seed)
+    if batch_size is None:
+        batch_size = adaptive_batch_size(len(X_train))
+    callbacks = []
+    if X_val is not None and patience is not None:
+        callbacks.append(EarlyStopping(monitor="val_loss", patience=patience, restore_best_weights=restore_best_weights))
+
+    input_dim = X_train.shape[1]
+    input_layer = Input(shape=(input_dim,))
+
+    encoded = Dense(encoding_dim * 2, activation='relu')(input_layer)
+    encoded = Dense(encoding_dim, activation='relu')(encoded)
+
+    decoded = Dense(encoding_dim * 2, activation='relu')(encoded)
+    output_layer = Dense(input_dim, activation='linear')(decoded)
+
+    autoencoder = Model(inputs=input_layer, outputs=output_layer)
+    autoencoder.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse')
+    autoencoder.fit(X_train, X_train,
+                    validation_data=(X_val, X_val) if X_val is not None else None,
+                    epochs=epochs, batch_size=batch_size, callbacks=callbacks, verbose=0)
+
+    return autoencoder
+
+def get_healthy_periods(df, score_name, delta_name, p_low=0.10, p_high=0.90):
+    healthy_mask = (
+        df[score_name].between(df[score_name].quantile(p_low), df[score_name].quantile(p_high)) &
+        df[delta_name].between(df[delta_name].quantile(p_low), df[delta_name].quantile(p_high))
+        #df["revenue_growth"].between(-rg_threshold, rg_threshold) don't use it for the moment as threshold
+    )
+    return df[healthy_mask].copy()
+
+
+def get_joint_healthy_periods(df, p_low=0.10, p_high=0.90):
+    # healthy for the joint model = inside the percentile box of every score and delta
+    bounds = df[JOINT_FEATURES].quantile([p_low, p_high])
+    healthy_mask = ((df[JOINT_FEATURES] >= bounds.iloc[0]) & (df[JOINT_FEATURES] <= bounds.iloc[1])).all(axis=1)
+    return df[healthy_mask].copy()
+
+
+def window_rows(values, window):
+    # (n_quarters, n_features) -> (n_quarters, window * n_features), each row = the last `window` quarters, oldest first.
+    # The windows are a strided view of the array; the first quarters are padded with the first row
+    # (as add_deltas gives them a zero delta) and only the final reshape materializes them.
+    padded = np.pad(values, ((window - 1, 0), (0, 0)), mode="edge")
+    return sliding_window_view(padded, window, axis=0).transpose(0, 2, 1).reshape(len(values), -1)
+
+
+def prepare_indicator(df_company, score, seed=None, backend="keras", hyperparams=None, p_low=0.10, p_high=0.90,
+                      healthy=None, window=None):
+    # healthy: per-model masks of the bank from healthy_periods.healthy_masks; default is the p_low/p_high box
+    # window: feed the last `window` quarters of the indicator instead of the current one (not for JOINT)
+    company = df_company["company"].iloc[0]
+    print(f"\n indicators : {score} ({company})")
+
+    if score == JOINT:
+        features, scores = JOINT_FEATURES, list(FEATURES_BY_SCORE)
+        hyperparams = hyperparams or JOINT_HYPERPARAMS
+    else:
+        features, scores = FEATURES_BY_SCORE[score], [score]
+        hyperparams = hyperparams or HYPERPARAMS
+
+    if healthy is not None:
+        df_healthy = df_company[healthy[score].values]
+    elif score == JOINT:
+        df_healthy = get_joint_healthy_periods(df_company, p_low, p_high)
+    else:
+        df_healthy = get_healthy_periods(df_company, *features, p_low, p_high)
+    print(f" {len(df_healthy)} health period identified.")
+
+    raw_full = df_company[features].values
+    raw_train = df_healthy[features].values
+    if window and score != JOINT:
+        # windows read the rows as consecutive quarters, oldest first (load_company sorts them)
+        if not pd.to_datetime(df_company["date"]).is_monotonic_increasing:
+            raise ValueError(f"windowed models need {company}'s quarters oldest first, use load_company")
+        # a window is healthy when at least half of its quarters are (requiring all of them leaves too few
+        # windows and flags every window touching a single unusual quarter)
+        healthy_rows = df_company.index.isin(df_healthy.index)
+        healthy_windows = sliding_window_view(np.pad(healthy_rows, (window - 1, 0), mode="edge"), window).mean(axis=1) >= 0.5
+        raw_full = window_rows(raw_full, window)
+        raw_train = raw_full[healthy_windows]
+        print(f" {len(raw_train)} fenêtres saines de {window} trimestres.")
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(raw_train)
+    X_full = scaler.transform(raw_full)
+
+    train_rows, val_rows = train_test_split(np.arange(len(X_train)), test_size=0.2, random_state=42)
+    X_tr, X_val = X_train[train_rows], X_train[val_rows]
+    print(f" {len(X_tr)} trimestres d'entraînement, {len(X_val)} de validation.")
+
+    calibration_rows = None
+    if score == JOINT:
+        # the 8-way healthy intersection leaves only a few validation rows: each indicator's threshold is
+        # calibrated on the quarters healthy for that indicator, minus the ones the joint model was fitted on
+        fitted = np.flatnonzero(df_company.index.isin(df_healthy.index))[train_rows]
+        calibration_rows = []
+        for indicator in scores:
+            if healthy is not None:
+                mask = healthy[indicator].values
+            else:
+                df_indicator = get_healthy_periods(df_company, *FEATURES_BY_SCORE[indicator], p_low, p_high)
+                mask = df_company.index.isin(df_indicator.index)
+            calibration_rows.append(np.setdiff1d(np.flatnonzero(mask), fitted))
+            print(f" {indicator} : {mask.sum()} trimestres sains, {len(calibration_rows[-1])} pour le seuil.")
+
+    # the raw healthy rows fully determine scaler, split and fit: they key the training cache
+    cache_key = training_key(raw_train, hyperparams, seed, backend)
+
+    return {"company": company, "score": score, "scores": scores, "hyperparams": hyperparams,
+            "name": f"{score}_w{window}" if window and score != JOINT else score,
+            "scaler": scaler, "cache_key": cache_key, "seed": seed, "calibration_rows": calibration_rows,
+            "X_train": X_train, "X_full": X_full, "X_tr": X_tr, "X_val": X_val}
+
+
+def calibration_errors(job, i, mse_full, mse_val):
+    # errors the threshold of the job's i-th indicator is calibrated on: the validation rows,
+    # or for a joint model the indicator's own held-out healthy quarters (prepare_indicator)
+    if job["calibration_rows"] is None:
+        return mse_val
+    return mse_full[job["calibration_rows"][i]]
+
+
+# below this many calibration errors the bootstrapped band covers most of their range and the threshold
+# sits at its top edge: no band and no borderline flag then
+MIN_BOOTSTRAP_ERRORS = 20
+
+
+def bootstrap_threshold(errors, percentile=95, n_boot=2000, ci=0.90, seed=None, min_errors=MIN_BOOTSTRAP_ERRORS):
+    # resample the calibration errors n_boot times in one (n_boot, n) draw; the spread of the
+    # resampled percentiles gives a confidence band around the threshold (None with too few errors)
+    errors = np.asarray(errors)
+    threshold = np.percentile(errors, percentile)
+    if len(errors) < min_errors:
+        return threshold, None
+    rng = np.random.default_rng(seed)
+    resampled = np.percentile(errors[rng.integers(0, len(errors), (n_boot, len(errors)))], percentile, axis=1)
+    low, high = np.percentile(resampled, [50 * (1 - ci), 50 * (1 + ci)])
+    return threshold, (low, high)
+
+
+def describe_threshold(threshold, threshold_ci):
+    if threshold_ci is None:
+        return f"{threshold:.4f} [pas d'IC : moins de {MIN_BOOTSTRAP_ERRORS} erreurs de calibration]"
+    return f"{threshold:.4f} [IC 90% : {threshold_ci[0]:.4f} - {threshold_ci[1]:.4f}]"
+
+
+def keras_predict_with_code(model, X):
+    # one pass through a two-output view of the autoencoder: reconstruction and bottleneck code
+    import keras
+    return keras.Model(model.inputs, [model.outputs[0], model.layers[2].output]).predict(X, verbose=0)
+
+
+def error_contributions(squared, width):
+    # split each row's mean squared error between the level (score) and change (delta) features;
+    # the two contributions add up to the reconstruction error (windowed inputs alternate score/delta per quarter)
+    return squared.reshape(len(squared), -1, 2).sum(axis=1) / width
+
+
+def finish_indicator(df_company, job, X_pred, X_val_pred, code=None):
+    company = job["company"]
+    squared_full = np.square(job["X_full"] - X_pred)
+    squared_val = np.square(job["X_val"] - X_val_pred)
+
+    df_errors_all, thresholds = [], []
+    # one (score, delta) column pair per indicator; a joint model is sliced into its four indicators
+    width = job["X_full"].shape[1] // len(job["scores"])
+    for i, score in enumerate(job["scores"]):
+        columns = slice(width * i, width * (i + 1))
+
+        # rebuild for all priods
+        mse = squared_full[:, columns].mean(axis=1)
+
+        # rebuild in health period
+        mse_val = calibration_errors(job, i, mse, squared_val[:, columns].mean(axis=1))
+
+        # threshold 95 percentil of helathy period
+        threshold, threshold_ci = bootstrap_threshold(mse_val, seed=job["seed"])
+        print(f" Seuil d’anomalie (95e percentile) pour {score} ({company}) : {describe_threshold(threshold, threshold_ci)}")
+        thresholds.append(threshold)
+
+        df_errors = build_errors_frame(df_company, score, mse, threshold, threshold_ci)
+        contributions = error_contributions(squared_full[:, columns], width)
+        df_errors[f"contribution_score_{score}"] = contributions[:, 0]
+        df_errors[f"contribution_delta_{score}"] = contributions[:, 1]
+        df_errors_all.append(df_errors)
+
+    job["threshold"] = np.array(thresholds) if job["score"] == JOINT else thresholds[0]
+    df_errors_merged = merge_errors(df_errors_all)
+    if code is not None:
+        # bottleneck coordinates of every quarter, one set per model (per indicator, or "joint")
+        for j in range(code.shape[1]):
+            df_errors_merged[f"latent{j + 1}_{job['score']}"] = code[:, j]
+    return df_errors_merged
+
+
+def log_fit(df_errors, job, epochs_run, seconds):
+    # kept on the frame so train_all can sum the training budget over the whole bank universe
+    max_epochs = job["hyperparams"]["epochs"]
+    df_errors.attrs["fit_stats"] = {"epochs": int(epochs_run), "max_epochs": max_epochs, "seconds": seconds}
+    print(f" {job['score']} ({job['company']}) : {epochs_run}/{max_epochs} epochs en {seconds:.2f}s")
+
+
+def finish_cached(df_company, job, cached_model, registry):
+    print(f" Modèle inchangé pour {job['score']} ({job['company']}), réutilisation du cache.")
+    X_pred, code = forward_with_code(cached_model, job["X_full"])
+    df_errors = finish_indicator(df_company, job, X_pred, forward(cached_model, job["X_val"]), code)
+    # register the cached weights only when the latest version is not already this model
+    if registry.registered_version(job["company"], job["name"], job["cache_key"]) is None:
+        weights = [array for layer in cached_model["layers"] for array in layer]
+        registry.save(job["company"], job["name"], weights, job["scaler"], job["threshold"],
+                      training_key=job["cache_key"])
+    log_fit(df_errors, job, 0, 0.0)
+    return df_errors
+
+
+def fit_indicator(df_company, score, registry_dir="model_registry", cache_dir="training_cache", seed=None, healthy=None,
+                  window=None):
+    job = prepare_indicator(df_company, score, seed, healthy=healthy, window=window)
+    registry = ModelRegistry(registry_dir)
+    cache = TrainingCache(cache_dir) if cache_dir else None
+
+    cached_model = cache.get(job["cache_key"]) if cache else None
+    if cached_model is not None:
+        return finish_cached(df_company, job, cached_model, registry)
+
+    start = time.perf_counter()
+    model = train_autoencoder(job["X_tr"], X_val=job["X_val"], seed=seed, **job["hyperparams"])
+    seconds = time.perf_counter() - start
+
+    X_pred, code = keras_predict_with_code(model, job["X_full"])
+    X_val_pred = model.predict(job["X_val"], verbose=0)
+    df_errors = finish_indicator(df_company, job, X_pred, X_val_pred, code)
+    log_fit(df_errors, job, len(model.history.epoch), seconds)
+    version = registry.save(job["company"], job["name"], model.get_weights(), job["scaler"], job["threshold"],
+                            training_key=job["cache_key"])
+    model.save(registry.path(job["company"], job["name"], version, ".h5"), save_format='h5')
+    if cache:
+        cache.put(job["cache_key"], model.get_weights(), job["scaler"], job["threshold"])
+    return df_errors
+
+
+def fit_batched(fit_jobs, seed=None):
+    # one BatchedAutoencoder for every job; returns the model and the fit time per model
+    from numpy_autoencoder import BatchedAutoencoder
+
+    hyperparams = fit_jobs[0]["hyperparams"]
+    model = BatchedAutoencoder(len(fit_jobs), input_dim=fit_jobs[0]["X_tr"].shape[1], encoding_dim=hyperparams["encoding_dim"],
+                               learning_rate=hyperparams["learning_rate"], seed=seed)
+    batch_sizes = [hyperparams["batch_size"] or adaptive_batch_size(len(job["X_tr"])) for job in fit_jobs]
+    start = time.perf_counter()
+    model.fit([job["X_tr"] for job in fit_jobs], epochs=hyperparams["epochs"], batch_size=np.array(batch_sizes),
+              X_val_list=[job["X_val"] for job in fit_jobs], patience=hyperparams["patience"],
+              restore_best_weights=hyperparams["restore_best_weights"])
+    # the models share one vectorized fit: spread its time evenly
+    return model, (time.perf_counter() - start) / len(fit_jobs)
+
+
+def fit_companies_numpy(frames, scores=None, seed=None, registry_dir="model_registry", cache_dir="training_cache",
+                        healthy=None, windows=None):
+    # all (company, indicator) models of the numpy backend are trained together in one BatchedAutoencoder
+    # per input size (scores=[JOINT] trains one joint model per company instead)
+    scores = scores or list(FEATURES_BY_SCORE)
+    windows = windows or {}
+    jobs = [prepare_indicator(df_company, score, seed, backend="numpy", healthy=None if healthy is None else healthy[company],
+                              window=windows.get(score))
+            for company, df_company in frames.items() for score in scores]
+    registry = ModelRegistry(registry_dir)
+    cache = TrainingCache(cache_dir) if cache_dir else None
+
+    df_errors_all = [None] * len(jobs)
+    to_fit = []
+    for i, job in enumerate(jobs):
+        cached_model = cache.get(job["cache_key"]) if cache else None
+        if cached_model is not None:
+            df_errors_all[i] = finish_cached(frames[job["company"]], job, cached_model, registry)
+        else:
+            to_fit.append(i)
+    print(f"\n {len(jobs) - len(to_fit)} modèles repris du cache, {len(to_fit)} à entraîner.")
+    if not to_fit:
+        return df_errors_all
+
+    for input_dim in sorted({jobs[i]["X_tr"].shape[1] for i in to_fit}):
+        group = [i for i in to_fit if jobs[i]["X_tr"].shape[1] == input_dim]
+        model, seconds = fit_batched([jobs[i] for i in group], seed)
+        X_preds, codes = model.predict_with_codes([jobs[i]["X_full"] for i in group])
+        X_val_preds = model.predict([jobs[i]["X_val"] for i in group])
+
+        for m, (i, X_pred, X_val_pred, code) in enumerate(zip(group, X_preds, X_val_preds, codes)):
+            job = jobs[i]
+            df_errors_all[i] = finish_indicator(frames[job["company"]], job, X_pred, X_val_pred, code)
+            log_fit(df_errors_all[i], job, model.epochs_run[m], seconds)
+            registry.save(job["company"], job["name"], model.get_weights(m), job["scaler"], job["threshold"],
+                          training_key=job["cache_key"])
+            if cache:
+                cache.put(job["cache_key"], model.get_weights(m), job["scaler"], job["threshold"])
+    return df_errors_all
+
+
+def fit_ensemble_numpy(frames, n_members=5, scores=None, seed=None, healthy=None, windows=None):
+    # n_members differently initialised copies of every (company, indicator) model, in one BatchedAutoencoder
+    # per input size: the flag uses the mean error of the members and their std gives an uncertainty band.
+    # Ensembles are not written to the registry or the training cache.
+    scores = scores or list(FEATURES_BY_SCORE)
+    windows = windows or {}
+    jobs = [prepare_indicator(df_company, score, seed, backend="numpy", healthy=None if healthy is None else healthy[company],
+                              window=windows.get(score))
+            for company, df_company in frames.items() for score in scores]
+
+    df_errors_all = [None] * len(jobs)
+    for input_dim in sorted({job["X_tr"].shape[1] for job in jobs}):
+        group = [j for j, job in enumerate(jobs) if job["X_tr"].shape[1] == input_dim]
+        # member k of the g-th job of the group is model g * n_members + k
+        model, seconds = fit_batched([jobs[j] for j in group for _ in range(n_members)], seed)
+        X_preds = model.predict([jobs[j]["X_full"] for j in group for _ in range(n_members)])
+        X_val_preds = model.predict([jobs[j]["X_val"] for j in group for _ in range(n_members)])
+
+        for g, j in enumerate(group):
+            job = jobs[j]
+            members = slice(g * n_members, (g + 1) * n_members)
+            squared_full = np.square(job["X_full"] - np.stack(X_preds[members]))
+            squared_val = np.square(job["X_val"] - np.stack(X_val_preds[members]))
+
+            df_job = []
+            # same column layout as finish_indicator (windowed inputs are width = 2 * window wide)
+            width = job["X_full"].shape[1] // len(job["scores"])
+            for i, score in enumerate(job["scores"]):
+                columns = slice(width * i, width * (i + 1))
+                mse_members = squared_full[:, :, columns].mean(axis=2)
+                mse_val = squared_val[:, :, columns].mean(axis=2).mean(axis=0)
+                mse_val = calibration_errors(job, i, mse_members.mean(axis=0), mse_val)
+
+                threshold, threshold_ci = bootstrap_threshold(mse_val, seed=seed)
+                print(f" Seuil d’anomalie (95e percentile, ensemble de {n_members}) pour {score} ({job['company']}) : "
+                      f"{describe_threshold(threshold, threshold_ci)}")
+                df_errors = build_errors_frame(frames[job["company"]], score, mse_members.mean(axis=0), threshold, threshold_ci)
+                df_errors[f"reconstruction_error_std_{score}"] = mse_members.std(axis=0)
+                contributions = error_contributions(squared_full[:, :, columns].mean(axis=0), width)
+                df_errors[f"contribution_score_{score}"] = contributions[:, 0]
+                df_errors[f"contribution_delta_{score}"] = contributions[:, 1]
+                df_job.append(df_errors)
+
+            df_errors_all[j] = merge_errors(df_job)
+            log_fit(df_errors_all[j], job, model.epochs_run[members].max(), seconds * n_members)
+    return df_errors_all
+
+
+def fit_detector(df_company, score, detector, seed=None, healthy=None):
+    # same healthy periods, scaling and 95th-percentile calibration as the autoencoder, any detector of detectors.py
+    from detectors import make_detector
+
+    job = prepare_indicator(df_company, score, seed, healthy=healthy)
+    kwargs = {"seed": seed} if detector in ("autoencoder", "isolation_forest") else {}
+    model = make_detector(detector, **kwargs).fit(job["X_tr"], job["X_val"])
+    threshold = model.calibrate(job["X_val"], seed=seed)
+    threshold_ci = model.threshold_ci
+    print(f" Seuil d’anomalie (95e percentile, {detector}) pour {score} ({job['company']}) : "
+          f"{describe_threshold(threshold, threshold_ci)}")
+    return build_errors_frame(df_company, score, model.score(job["X_full"]), threshold, threshold_ci)
+
+
+def build_errors_frame(df_company, score, mse, threshold, threshold_ci=None, features=None):
+    # features: value columns copied to the output, the last one being the delta that signs the anomaly type
+    features = features or FEATURES_BY_SCORE[score]
+    delta_col = features[-1]
+
+    #  anomaly detection
+    is_anomaly = mse > threshold
+    delta = df_company[delta_col].values
+    anomaly_type = np.where(is_anomaly & (delta > 0), "positive",
+                     np.where(is_anomaly & (delta < 0), "negative", "none"))
+
+    df_errors = pd.DataFrame({
+        "date": df_company["date"].values,
+        "company": df_company["company"].values,
+        **{column: df_company[column].values for column in features},
+        f"reconstruction_error_{score}": mse,
+        f"is_anomaly_{score}": is_anomaly,
+        f"anomaly_type_{score}": anomaly_type,
+        f"threshold_{score}": np.broadcast_to(threshold, len(df_company))
+    })
+    if threshold_ci is not None:
+        # quarters whose error falls inside the threshold's confidence band could go either way
+        # (only with enough calibration errors for a meaningful band, see bootstrap_threshold)
+        low, high = threshold_ci
+        df_errors[f"threshold_low_{score}"] = low
+        df_errors[f"threshold_high_{score}"] = high
+        df_errors[f"is_borderline_{score}"] = (mse >= low) & (mse <= high)
+    return df_errors
+
+
+def merge_errors(df_errors_all):
+    if not df_errors_all:
+        print(" Aucun score n’a pu être traité, DataFrame final vide.")
+        return pd.DataFrame()
+
+    # Fusion sur 'date' et 'company'
+    return reduce(lambda left, right: pd.merge(left, right, on=["date", "company"]), df_errors_all)
+
+
+def run_anomaly_pipeline(df_company, registry_dir="model_registry", backend="keras", cache_dir="training_cache", seed=None,
+                         joint=False, detector="autoencoder", ensemble=None, healthy=None, windows=None):
+    # healthy: the bank's masks from healthy_periods.healthy_masks (default: 10/90 quantile box)
+    # windows: {indicator: number of quarters} for the windowed autoencoders (e.g. WINDOWS)
+    scores = [JOINT] if joint else list(FEATURES_BY_SCORE)
+    company = df_company["company"].iloc[0]
+    if detector != "autoencoder":
+        df_errors_all = [fit_detector(df_company, score, detector, seed, healthy) for score in FEATURES_BY_SCORE]
+    elif ensemble:
+        df_errors_all = fit_ensemble_numpy({company: df_company}, ensemble, scores, seed,
+                                           healthy=None if healthy is None else {company: healthy}, windows=windows)
+    elif backend == "numpy":
+        df_errors_all = fit_companies_numpy({company: df_company}, scores, seed=seed, registry_dir=registry_dir,
+                                            cache_dir=cache_dir, healthy=None if healthy is None else {company: healthy},
+                                            windows=windows)
+    else:
+        df_errors_all = [fit_indicator(df_company, score, registry_dir, cache_dir, seed, healthy, (windows or {}).get(score))
+                         for score in scores]
+    df_errors_merged = merge_errors(df_errors_all)
+    print("\n Fusion des erreurs terminée.")
+    return df_errors_merged
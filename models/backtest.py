@@ -0,0 +1,118 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, HYPERPARAMS, adaptive_batch_size, build_errors_frame, load_company, \
+    merge_errors, prepare_indicator
+from bank_events import BANK_EVENTS
+from feature_store import load_dataset
+
+
+def backtest_company(df_company, min_history=20, warm_epochs=30, threshold_percentile=95, seed=None):
+    # Walk-forward: for every quarter t, fit on quarters <= t only and score quarter t+1.
+    # The 4 indicator models of the bank are trained together and each fold starts from the weights
+    # (and Adam state) of the previous one, so later folds only need a few epochs.
+    from numpy_autoencoder import BatchedAutoencoder
+
+    df_company = df_company.sort_values("date").reset_index(drop=True)
+    scores = list(FEATURES_BY_SCORE)
+    model = BatchedAutoencoder(len(scores), input_dim=2, encoding_dim=HYPERPARAMS["encoding_dim"],
+                               learning_rate=HYPERPARAMS["learning_rate"], seed=seed)
+
+    mse = {score: [] for score in scores}
+    thresholds = {score: [] for score in scores}
+    for t in range(min_history - 1, len(df_company) - 1):
+        history = df_company.iloc[:t + 1]
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            jobs = [prepare_indicator(history, score, seed, "numpy") for score in scores]
+
+        model.fit([job["X_tr"] for job in jobs],
+                  epochs=HYPERPARAMS["epochs"] if t == min_history - 1 else warm_epochs,
+                  batch_size=np.array([adaptive_batch_size(len(job["X_tr"])) for job in jobs]),
+                  X_val_list=[job["X_val"] for job in jobs], patience=HYPERPARAMS["patience"],
+                  restore_best_weights=HYPERPARAMS["restore_best_weights"])
+
+        X_next = [job["scaler"].transform(df_company.iloc[[t + 1]][FEATURES_BY_SCORE[score]].values)
+                  for job, score in zip(jobs, scores)]
+        X_next_preds = model.predict(X_next)
+        X_val_preds = model.predict([job["X_val"] for job in jobs])
+        for job, score, x, x_pred, x_val_pred in zip(jobs, scores, X_next, X_next_preds, X_val_preds):
+            mse_val = np.mean(np.square(job["X_val"] - x_val_pred), axis=1)
+            thresholds[score].append(np.percentile(mse_val, threshold_percentile))
+            mse[score].append(np.mean(np.square(x - x_pred)))
+
+    df_scored = df_company.iloc[min_history:]
+    print(f" {df_company['company'].iloc[0]} : {len(df_scored)} out-of-sample quarters.")
+    return merge_errors([build_errors_frame(df_scored, score, np.array(mse[score]), np.array(thresholds[score]))
+                         for score in scores])
+
+
+def detection_delays(df_backtest, horizon=4):
+    # first out-of-sample anomaly on the targeted indicator within `horizon` quarters after each event
+    rows = []
+    for company, events in BANK_EVENTS.items():
+        df_c = df_backtest[df_backtest["company"] == company]
+        if df_c.empty:
+            continue
+        quarters = pd.to_datetime(df_c["date"]).dt.to_period("Q")
+        for _, event in events.iterrows():
+            event_quarter = pd.Timestamp(event["date"]).to_period("Q")
+            if event_quarter < quarters.min() or event_quarter > quarters.max():
+                continue
+            for score in FEATURES_BY_SCORE:
+                if score not in event["target"]:
+                    continue
+                delays = [(quarter - event_quarter).n for quarter, flag
+                          in zip(quarters, df_c[f"is_anomaly_{score}"]) if flag]
+                delays = [delay for delay in delays if 0 <= delay <= horizon]
+                rows.append({
+                    "company": company,
+                    "indicator": score,
+                    "event": event["event"],
+                    "event_date": event["date"],
+                    "detected": bool(delays),
+                    "delay_quarters": min(delays) if delays else np.nan
+                })
+    return pd.DataFrame(rows, columns=["company", "indicator", "event", "event_date", "detected", "delay_quarters"])
+
+
+def run_backtest(df, companies, output_dir, workers=None, min_history=20, seed=None):
+    frames = [load_company(df, company) for company in companies]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        df_backtest = pd.concat(list(pool.map(partial(backtest_company, min_history=min_history, seed=seed), frames)),
+                                ignore_index=True)
+    df_delays = detection_delays(df_backtest)
+
+    os.makedirs(output_dir, exist_ok=True)
+    df_backtest.to_csv(os.path.join(output_dir, "backtest_anomalies.csv"), index=False)
+    df_delays.to_csv(os.path.join(output_dir, "backtest_detection_delays.csv"), index=False)
+
+    if not df_delays.empty:
+        print(df_delays.groupby("indicator").agg(events=("event", "count"), detection_rate=("detected", "mean"),
+                                                 median_delay=("delay_quarters", "median")))
+    return df_backtest, df_delays
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Walk-forward out-of-sample backtest of the autoencoder detector.")
+    parser.add_argument("--data", default="dataset1_complet.csv", help="dataset CSV or feature store directory")
+    parser.add_argument("--companies", nargs="*", default=None)
+    parser.add_argument("--output-dir", default="backtest")
+    parser.add_argument("--min-history", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    df = load_dataset(args.data)
+    companies = args.companies or sorted(df["company"].dropna().unique())
+    run_backtest(df, companies, args.output_dir, args.workers, args.min_history, args.seed)
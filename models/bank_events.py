@@ -0,0 +1,56 @@
+import pandas as pd
+
+# news/events per bank, used by the anomaly page and the walk-forward backtest
+BANK_EVENTS = {
+    # JP Morgan Chase
+    "JP Morgan Chase": pd.DataFrame([
+        {"date":"2012-07-01", "event":"London Whale", "target":"profitability"},
+        {"date":"2013-07-01", "event":"$13B DOJ subprime", "target":"profitability/solvency/leverage/liquidity"},
+        {"date":"2019-09-17", "event":"Tensions repo US", "target":"liquidity"},
+        {"date":"2020-03-31", "event":"COVID-19", "target":"profitability/liquidity/growth"},
+        {"date":"2021-01-15", "event":"Record $12.1B Q4 profit", "target":"profitability"},
+        {"date":"2023-03-15", "event":"SVB crisis", "target":"solvency/liquidity"},
+        {"date":"2025-01-14", "event":"Whistleblower", "target":"solvency/profitability/leverage"},
+        {"date":"2025-06-21", "event":"Directive FDIC", "target":"liquidity"},
+    ]),
+    
+    # Banco Santander
+    "Banco Santander": pd.DataFrame([
+        {"date":"2008-10-01", "event":"Acquisition of Sovereign Bank", "target":"growth"},
+        {"date":"2012-06-01", "event":"Spain banking crisis bailout", "target":"solvency/liquidity"},
+        {"date":"2015-01-08", "event":"€7.5B capital increase", "target":"solvency/leverage"},
+        {"date":"2017-06-07", "event":"Acquisition of Banco Popular", "target":"growth/solvency"},
+        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/solvency"},
+        {"date":"2023-03-15", "event":"SVB crisis exposure concerns", "target":"liquidity"},
+    ]),
+    
+    # BNP Paribas
+    "BNP Paribas": pd.DataFrame([
+        {"date":"2008-10-01", "event":"Financial crisis impact", "target":"liquidity/solvency"},
+        {"date":"2014-06-30", "event":"$8.9B US sanctions fine", "target":"profitability/solvency"},
+        {"date":"2016-07-01", "event":"Restructuring of Corporate & Institutional Banking", "target":"profitability"},
+        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/liquidity"},
+        {"date":"2022-01-01", "event":"Sale of US retail bank", "target":"liquidity/profitability"},
+        {"date":"2023-03-15", "event":"SVB crisis market volatility", "target":"liquidity"},
+    ]),
+    
+    # Crédit Agricole
+    "Crédit Agricole": pd.DataFrame([
+        {"date":"2008-10-01", "event":"Global financial crisis", "target":"solvency/liquidity"},
+        {"date":"2011-11-01", "event":"Greek debt exposure losses", "target":"solvency/profitability"},
+        {"date":"2016-02-01", "event":"Exit from Emporiki Bank Greece", "target":"growth/solvency"},
+        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/liquidity"},
+        {"date":"2021-06-01", "event":"Acquisition of Creval in Italy", "target":"growth"},
+        {"date":"2023-03-15", "event":"SVB crisis impact", "target":"liquidity"},
+    ]),
+    
+    # HSBC
+    "HSBC": pd.DataFrame([
+        {"date":"2008-03-01", "event":"Subprime crisis losses", "target":"profitability/solvency"},
+        {"date":"2012-12-11", "event":"$1.9B US money laundering fine", "target":"profitability/solvency"},
+        {"date":"2015-06-01", "event":"Global restructuring announced", "target":"profitability/leverage"},
+        {"date":"2020-03-31", "event":"COVID-19 provisions", "target":"profitability/liquidity"},
+        {"date":"2021-02-23", "event":"Pivot to Asia strategy", "target":"growth/solvency"},
+        {"date":"2023-03-15", "event":"SVB crisis UK acquisition", "target":"liquidity/growth"},
+    ])
+}
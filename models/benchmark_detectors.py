@@ -0,0 +1,87 @@
+import argparse
+import contextlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, load_company, prepare_indicator
+from detectors import DETECTORS, make_detector
+from feature_store import load_dataset
+
+
+def jaccard(flags_a, flags_b):
+    union = np.sum(flags_a | flags_b)
+    return 1.0 if union == 0 else np.sum(flags_a & flags_b) / union
+
+
+def benchmark_indicator(df_company, score, backend="keras", seed=None):
+    # every detector sees the same healthy periods, scaling and validation split as the autoencoder
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        job = prepare_indicator(df_company, score, seed)
+
+    rows, flags = [], {}
+    for name in DETECTORS:
+        kwargs = {"seed": seed} if name == "isolation_forest" else {}
+        if name == "autoencoder":
+            kwargs = {"backend": backend, "seed": seed}
+        detector = make_detector(name, **kwargs)
+
+        start = time.perf_counter()
+        detector.fit(job["X_tr"], job["X_val"])
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        errors = detector.score(job["X_full"])
+        score_seconds = time.perf_counter() - start
+
+        flags[name] = errors > detector.calibrate(job["X_val"], seed=seed)
+        rows.append({
+            "company": job["company"],
+            "indicator": score,
+            "detector": name,
+            "fit_seconds": fit_seconds,
+            "score_seconds": score_seconds,
+            "n_anomalies": int(flags[name].sum())
+        })
+
+    for row in rows:
+        row["jaccard_vs_autoencoder"] = jaccard(flags[row["detector"]], flags["autoencoder"])
+    return rows
+
+
+def run_benchmark(df, companies, output_path, backend="keras", seed=None):
+    rows = []
+    for company in companies:
+        df_company = load_company(df, company)
+        for score in FEATURES_BY_SCORE:
+            rows.extend(benchmark_indicator(df_company, score, backend, seed))
+        print(f" {company} : done.")
+
+    df_bench = pd.DataFrame(rows)
+    df_bench.to_csv(output_path, index=False)
+    print(df_bench.groupby("detector")
+          .agg(fit_seconds=("fit_seconds", "sum"), score_seconds=("score_seconds", "sum"),
+               n_anomalies=("n_anomalies", "sum"), jaccard_vs_autoencoder=("jaccard_vs_autoencoder", "mean"))
+          .sort_values("fit_seconds")
+          .to_string())
+    return df_bench
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fit/score time and anomaly overlap of each detector vs the autoencoder.")
+    parser.add_argument("--data", default="dataset1_complet.csv", help="dataset CSV or feature store directory")
+    parser.add_argument("--companies", nargs="*", default=None)
+    parser.add_argument("--output", default="detector_benchmark.csv")
+    parser.add_argument("--backend", choices=["keras", "numpy"], default="keras",
+                        help="autoencoder implementation used as the reference")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    df = load_dataset(args.data)
+    companies = args.companies or sorted(df["company"].dropna().unique())
+    run_benchmark(df, companies, args.output, args.backend, args.seed)
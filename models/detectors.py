@@ -0,0 +1,122 @@
+import abc
+
+import numpy as np
+
+from anomaly_pipeline import HYPERPARAMS, adaptive_batch_size, bootstrap_threshold, train_autoencoder
+
+
+class Detector(abc.ABC):
+    # fit on healthy periods, score every period (higher = more anomalous), calibrate a threshold
+    # on held-out healthy periods. The score is written to the reconstruction_error_<indicator> column.
+    name = None
+
+    def fit(self, X_train, X_val=None):
+        return self
+
+    @abc.abstractmethod
+    def score(self, X):
+        ...
+
+    def calibrate(self, X_val, percentile=95, seed=None):
+        # the autoencoder pipeline's calibration (95th percentile + bootstrap band), used by both
+        # run_anomaly_pipeline(detector=...) and the benchmark so they flag on the same thresholds
+        self.threshold, self.threshold_ci = bootstrap_threshold(self.score(X_val), percentile, seed=seed)
+        return self.threshold
+
+
+class AutoencoderDetector(Detector):
+    name = "autoencoder"
+
+    def __init__(self, backend="keras", seed=None):
+        self.backend = backend
+        self.seed = seed
+
+    def fit(self, X_train, X_val=None):
+        if self.backend == "numpy":
+            from numpy_autoencoder import BatchedAutoencoder
+            self.model = BatchedAutoencoder(1, X_train.shape[1], HYPERPARAMS["encoding_dim"],
+                                            HYPERPARAMS["learning_rate"], self.seed)
+            self.model.fit([X_train], epochs=HYPERPARAMS["epochs"], batch_size=adaptive_batch_size(len(X_train)),
+                           X_val_list=None if X_val is None else [X_val], patience=HYPERPARAMS["patience"],
+                           restore_best_weights=HYPERPARAMS["restore_best_weights"])
+        else:
+            self.model = train_autoencoder(X_train, X_val=X_val, seed=self.seed, **HYPERPARAMS)
+        return self
+
+    def score(self, X):
+        if self.backend == "numpy":
+            X_pred = self.model.predict([X])[0]
+        else:
+            X_pred = self.model.predict(X, verbose=0)
+        return np.mean(np.square(X - X_pred), axis=1)
+
+
+class MahalanobisDetector(Detector):
+    name = "mahalanobis"
+
+    def fit(self, X_train, X_val=None):
+        self.mean = X_train.mean(axis=0)
+        self.precision = np.linalg.pinv(np.cov(X_train, rowvar=False))
+        return self
+
+    def score(self, X):
+        centered = X - self.mean
+        return np.einsum("ij,jk,ik->i", centered, self.precision, centered)
+
+
+class PCADetector(Detector):
+    name = "pca"
+
+    def __init__(self, n_components=1):
+        self.n_components = n_components
+
+    def fit(self, X_train, X_val=None):
+        self.mean = X_train.mean(axis=0)
+        _, _, vt = np.linalg.svd(X_train - self.mean, full_matrices=False)
+        self.components = vt[:self.n_components]
+        return self
+
+    def score(self, X):
+        centered = X - self.mean
+        reconstructed = centered @ self.components.T @ self.components
+        return np.mean(np.square(centered - reconstructed), axis=1)
+
+
+class IsolationForestDetector(Detector):
+    name = "isolation_forest"
+
+    def __init__(self, n_estimators=100, seed=None):
+        self.n_estimators = n_estimators
+        self.seed = seed
+
+    def fit(self, X_train, X_val=None):
+        from sklearn.ensemble import IsolationForest
+        self.model = IsolationForest(n_estimators=self.n_estimators, random_state=self.seed).fit(X_train)
+        return self
+
+    def score(self, X):
+        return -self.model.score_samples(X)
+
+
+class RobustZDetector(Detector):
+    name = "robust_z"
+
+    def fit(self, X_train, X_val=None):
+        self.median = np.median(X_train, axis=0)
+        # 1.4826 * MAD estimates the standard deviation of normal data
+        self.scale = 1.4826 * np.median(np.abs(X_train - self.median), axis=0)
+        self.scale[self.scale == 0] = 1.0
+        return self
+
+    def score(self, X):
+        return np.mean(np.square((X - self.median) / self.scale), axis=1)
+
+
+DETECTORS = {detector.name: detector for detector in
+             [AutoencoderDetector, MahalanobisDetector, PCADetector, IsolationForestDetector, RobustZDetector]}
+
+
+def make_detector(name, **kwargs):
+    if name not in DETECTORS:
+        raise ValueError(f"unknown detector '{name}', expected one of {sorted(DETECTORS)}")
+    return DETECTORS[name](**kwargs)
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE
+from healthy_periods import dataset_version
+
+# Feature store: the dataset plus every derived feature (deltas, multi-lag differences, rolling means and
+# volatilities), computed once for all companies. It is written as one typed .npy file per column
+# (float64, datetime64, category codes) + meta.json, sorted by company and date, so readers memory-map
+# only the columns and companies they need. Its delta_<indicator> columns are the ones add_deltas gives on the
+# CSV path (change since the previous quarter, same float64 values): both paths train the same models.
+
+LAGS = (1, 2, 4)
+ROLLING_WINDOWS = (4, 8)
+
+
+def build_features(df, lags=LAGS, windows=ROLLING_WINDOWS):
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.dropna(subset=["company"]).sort_values(["company", "date"], kind="stable").reset_index(drop=True)
+
+    score_cols = [score_col for score_col, _ in FEATURES_BY_SCORE.values()]
+    grouped = df.groupby("company", sort=False)[score_cols]
+    features = {}
+    for lag in lags:
+        diff = df[score_cols] - grouped.shift(lag)
+        for score, (score_col, delta_col) in FEATURES_BY_SCORE.items():
+            # lag 1 keeps the delta_<indicator> name used by the models
+            features[delta_col if lag == 1 else f"delta{lag}_{score}"] = diff[score_col]
+    for window in windows:
+        rolling = grouped.rolling(window, min_periods=1)
+        means = rolling.mean().reset_index(level=0, drop=True)
+        vols = rolling.std().reset_index(level=0, drop=True)
+        for score, (score_col, _) in FEATURES_BY_SCORE.items():
+            features[f"mean{window}_{score}"] = means[score_col]
+            features[f"vol{window}_{score}"] = vols[score_col]
+
+    # same convention as add_deltas (no previous quarter -> 0), but only on the model features:
+    # raw ratios and macro columns keep their missing values
+    df[score_cols] = df[score_cols].fillna(0)
+    return pd.concat([df, pd.DataFrame(features).fillna(0)], axis=1)
+
+
+def write_store(df_features, path, version=None, float_dtype=np.float32):
+    os.makedirs(path, exist_ok=True)
+    # the company offsets need each company's rows next to each other
+    if df_features["company"].ne(df_features["company"].shift()).sum() > df_features["company"].nunique():
+        df_features = df_features.sort_values("company", kind="stable").reset_index(drop=True)
+    columns = {}
+    for column in df_features.columns:
+        values = df_features[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            array, meta = values.values.astype("datetime64[ns]"), {"kind": "datetime"}
+        elif pd.api.types.is_numeric_dtype(values):
+            array, meta = values.values.astype(float_dtype), {"kind": "float"}
+        else:
+            categorical = pd.Categorical(values)
+            array, meta = categorical.codes, {"kind": "category", "categories": list(categorical.categories)}
+        np.save(os.path.join(path, f"{column}.npy"), array)
+        columns[column] = meta
+
+    starts = np.flatnonzero(df_features["company"].ne(df_features["company"].shift()).values)
+    stops = np.append(starts[1:], len(df_features))
+    offsets = {df_features["company"].iloc[start]: [int(start), int(stop)] for start, stop in zip(starts, stops)}
+
+    # meta.json is written last: a store without it is incomplete
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": version, "n_rows": len(df_features), "columns": columns, "offsets": offsets},
+                  f, ensure_ascii=False, indent=1)
+
+
+def read_meta(path):
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_feature_store(df, path, lags=LAGS, windows=ROLLING_WINDOWS):
+    # no-op when the store already holds this version of the dataset with the same features
+    version = f"{dataset_version(df)}-{list(lags)}-{list(windows)}-float64"
+    meta = read_meta(path)
+    if meta is not None and meta["version"] == version:
+        print(f" Feature store à jour : {path}")
+        return meta
+    write_store(build_features(df, lags, windows), path, version, np.float64)
+    print(f" Feature store écrit : {path}")
+    return read_meta(path)
+
+
+def load_feature_store(path, columns=None, companies=None):
+    meta = read_meta(path)
+    columns = columns or list(meta["columns"])
+    if companies is None:
+        rows = [slice(0, meta["n_rows"])]
+    else:
+        rows = [slice(*meta["offsets"][company]) for company in companies if company in meta["offsets"]]
+
+    data = {}
+    for column in columns:
+        array = np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+        values = np.concatenate([array[row] for row in rows])
+        column_meta = meta["columns"][column]
+        if column_meta["kind"] == "category":
+            values = pd.Categorical.from_codes(values, column_meta["categories"])
+        data[column] = values
+    return pd.DataFrame(data)
+
+
+def load_dataset(path, columns=None, companies=None):
+    # the training, backtest and sweep scripts accept either the CSV or a feature store directory
+    if os.path.isdir(path):
+        return load_feature_store(path, columns, companies)
+    with open(path, encoding="utf-8") as f:
+        header = f.readline()
+    if ";" in header:
+        # dataset_unified.csv layout: typed parse, cached next to the file (models/ingest.py)
+        from ingest import load_unified
+        return load_unified(path, columns=columns, companies=companies)
+    return pd.read_csv(path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the feature store (deltas, lags, rolling statistics).")
+    parser.add_argument("--data", default="dataset1_complet.csv")
+    parser.add_argument("--output", default="feature_store")
+    parser.add_argument("--lags", nargs="*", type=int, default=list(LAGS))
+    parser.add_argument("--windows", nargs="*", type=int, default=list(ROLLING_WINDOWS))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    build_feature_store(pd.read_csv(args.data), args.output, args.lags, args.windows)
@@ -0,0 +1,102 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from anomaly_pipeline import bootstrap_threshold, build_errors_frame, merge_errors
+from feature_store import load_dataset
+from model_registry import company_slug
+from numpy_autoencoder import BatchedAutoencoder
+
+# Second detection mode, from Ml_learning_anomalies.ipynb: one autoencoder per group of raw ratios
+# (instead of the percentile scores), trained on the bank's whole interpolated history,
+# threshold = 95th percentile of the bank's own errors.
+RATIO_GROUPS = {
+    "rentabilité": ["ROE", "ROA", "net_margin"],
+    "solvabilité": ["debt_to_equity", "current_ratio"],
+    "liquidité": ["cash_ratio"],
+    "croissance": ["revenue_growth"]
+}
+
+# direction of each ratio: +1 when a rise is an improvement, -1 when it is a deterioration (more debt)
+RATIO_POLARITY = {"ROE": 1, "ROA": 1, "net_margin": 1, "debt_to_equity": -1, "current_ratio": 1, "cash_ratio": 1,
+                  "revenue_growth": 1}
+
+# BANK_EVENTS targets matching each group (used by page 6 to place the events on the group charts)
+GROUP_TARGETS = {"rentabilité": "profitability", "solvabilité": "solvency", "liquidité": "liquidity", "croissance": "growth"}
+
+GROUP_HYPERPARAMS = {"epochs": 100, "batch_size": 8, "learning_rate": 0.001}
+
+
+def interpolate_companies(df, columns):
+    # linear interpolation of the gaps inside each company's history (both ends filled), all companies in one groupby
+    df = df.dropna(subset=["company"]).copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values(["company", "date"], kind="stable")
+    df[columns] = df.groupby("company")[columns].transform(lambda s: s.interpolate(method="linear", limit_direction="both"))
+    return df
+
+
+def prepare_group(df_company, group):
+    columns = RATIO_GROUPS[group]
+    scaler = StandardScaler()
+    X = scaler.fit_transform(df_company[columns])
+    # direction of the group for the anomaly type: change of its mean standardized ratio since the previous quarter,
+    # each ratio signed by its polarity so that a positive delta is an improvement (as for the score deltas)
+    level = (X * np.array([RATIO_POLARITY[column] for column in columns])).mean(axis=1)
+    df_group = df_company[["date", "company"] + columns].copy()
+    df_group[f"delta_{group}"] = np.diff(level, prepend=level[0])
+    return {"company": df_company["company"].iloc[0], "group": group, "frame": df_group, "X": X,
+            "encoding_dim": min(2, len(columns))}
+
+
+def fit_groups(df, companies=None, seed=None):
+    columns = [column for group_columns in RATIO_GROUPS.values() for column in group_columns]
+    companies = companies or sorted(df["company"].dropna().unique())
+    df = interpolate_companies(df[df["company"].isin(companies)], columns)
+    jobs = [prepare_group(df_company, group)
+            for _, df_company in df.groupby("company", sort=False) for group in RATIO_GROUPS]
+
+    # every (company, group) model with the same input size and bottleneck is trained in one BatchedAutoencoder
+    start = time.perf_counter()
+    for input_dim, encoding_dim in sorted({(job["X"].shape[1], job["encoding_dim"]) for job in jobs}):
+        batch = [job for job in jobs if job["X"].shape[1] == input_dim and job["encoding_dim"] == encoding_dim]
+        model = BatchedAutoencoder(len(batch), input_dim, encoding_dim, GROUP_HYPERPARAMS["learning_rate"], seed)
+        model.fit([job["X"] for job in batch], epochs=GROUP_HYPERPARAMS["epochs"], batch_size=GROUP_HYPERPARAMS["batch_size"])
+        for job, X_pred in zip(batch, model.predict([job["X"] for job in batch])):
+            job["mse"] = np.mean(np.square(job["X"] - X_pred), axis=1)
+    print(f" {len(jobs)} modèles de groupes entraînés en {time.perf_counter() - start:.1f}s.")
+
+    results = {}
+    for job in jobs:
+        threshold, threshold_ci = bootstrap_threshold(job["mse"], seed=seed)
+        features = RATIO_GROUPS[job["group"]] + [f"delta_{job['group']}"]
+        results.setdefault(job["company"], []).append(
+            build_errors_frame(job["frame"], job["group"], job["mse"], threshold, threshold_ci, features))
+    return {company: merge_errors(df_errors_all) for company, df_errors_all in results.items()}
+
+
+def train_groups(df, output_dir, companies=None, seed=None):
+    os.makedirs(output_dir, exist_ok=True)
+    for company, df_errors in fit_groups(df, companies, seed).items():
+        # same layout as the score models' anomaly_results_<bank>.csv, read by page 6 for the comparison
+        output_path = os.path.join(output_dir, f"anomaly_results_groups_{company_slug(company)}.csv")
+        df_errors.to_csv(output_path, index=False)
+        print(f" {company} -> {output_path}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Raw-ratio group autoencoders for every bank.")
+    parser.add_argument("--data", default="dataset_unified.csv", help="dataset CSV or feature store directory")
+    parser.add_argument("--companies", nargs="*", default=None)
+    parser.add_argument("--output-dir", default="../app_streamlit/data")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    train_groups(load_dataset(args.data), args.output_dir, args.companies, args.seed)
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, JOINT, JOINT_FEATURES
+
+# Healthy-period selection for every bank at once. A strategy returns one boolean column per score/delta
+# feature (True = the quarter looks normal for that feature); indicator_masks combines them per model.
+
+MACRO_COLUMNS = ["gdp_growth_rate", "interest_rate"]
+
+
+def group_bounds(df, columns, p_low, p_high):
+    # per-bank quantiles broadcast back onto the rows
+    grouped = df.groupby("company")[columns]
+    return (grouped.quantile(p_low).reindex(df["company"]).set_axis(df.index),
+            grouped.quantile(p_high).reindex(df["company"]).set_axis(df.index))
+
+
+def quantile_box(df, p_low=0.10, p_high=0.90):
+    # same rule as get_healthy_periods: inside the bank's [p_low, p_high] percentile range
+    low, high = group_bounds(df, JOINT_FEATURES, p_low, p_high)
+    return (df[JOINT_FEATURES] >= low) & (df[JOINT_FEATURES] <= high)
+
+
+def rolling_mad(df, window=12, n_mads=2.0):
+    # within n_mads rolling median absolute deviations of the bank's rolling median;
+    # the first quarters, without enough history, count as healthy
+    df = df.sort_values(["company", "date"])
+    rolling = df.groupby("company")[JOINT_FEATURES].rolling(window, min_periods=window // 2)
+    deviation = (df[JOINT_FEATURES] - rolling.median().reset_index(level=0, drop=True)).abs()
+    mad = deviation.groupby(df["company"]).rolling(window, min_periods=window // 2).median().reset_index(level=0, drop=True)
+    healthy = (deviation <= n_mads * 1.4826 * mad) | mad.isna()
+    return healthy.reindex(df.index)
+
+
+def macro_conditioned(df, p_low=0.10, p_high=0.90, macro_low=0.05, macro_high=0.95):
+    # quantile box, minus the quarters where growth or rates were extreme for the bank's economy
+    # (a missing macro value does not exclude the quarter)
+    low, high = group_bounds(df, MACRO_COLUMNS, macro_low, macro_high)
+    macro = df[MACRO_COLUMNS]
+    calm = ((macro >= low) & (macro <= high) | macro.isna()).all(axis=1)
+    return quantile_box(df, p_low, p_high).mul(calm, axis=0)
+
+
+STRATEGIES = {"quantile": quantile_box, "rolling_mad": rolling_mad, "macro": macro_conditioned}
+
+
+def indicator_masks(feature_masks):
+    # an indicator model trains on quarters where both its score and its delta are healthy; the joint model on all eight
+    masks = pd.DataFrame({score: feature_masks[features].all(axis=1) for score, features in FEATURES_BY_SCORE.items()})
+    masks[JOINT] = feature_masks[JOINT_FEATURES].all(axis=1)
+    return masks
+
+
+def dataset_version(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes()).hexdigest()
+
+
+def healthy_masks(frames, strategy="quantile", cache_dir="healthy_cache", **params):
+    # frames: {company: frame from load_company}. Returns {company: boolean frame with one column per model},
+    # aligned on each frame's index. Masks are cached on disk per dataset version, strategy and parameters.
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown healthy-period strategy '{strategy}', expected one of {sorted(STRATEGIES)}")
+    df = pd.concat(frames.values())
+
+    key = hashlib.sha256(json.dumps({"data": dataset_version(df), "strategy": strategy, "params": params},
+                                    sort_keys=True).encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"{strategy}_{key}.pkl") if cache_dir else None
+    if path and os.path.exists(path):
+        masks = pd.read_pickle(path)
+    else:
+        masks = indicator_masks(STRATEGIES[strategy](df, **params))
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            masks.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+
+    return {company: masks.loc[frame.index] for company, frame in frames.items()}
+
+
+def masks_frame(frames, masks):
+    # long format for the app: one row per bank and quarter, one healthy_<indicator> column per model
+    return pd.concat([
+        pd.concat([frame[["date", "company"]], masks[company].add_prefix("healthy_")], axis=1)
+        for company, frame in frames.items()
+    ], ignore_index=True)
@@ -0,0 +1,69 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_store import load_feature_store, read_meta, write_store
+
+# Typed ingest of dataset_unified.csv (';' separator, decimal commas): the schema is given to the parser,
+# so the ratios come out as floats directly instead of going through .astype(str).str.replace(",", ".")
+# and pd.to_numeric column by column. They stay float64, the exact values of the text: the scores computed
+# from them are compared with thresholds (0.1 in float32 is 0.10000000149). The parsed table is cached in
+# the feature store's columnar format (one .npy per column + meta.json); a later load memory-maps it instead
+# of parsing the text again.
+
+FLOAT_COLUMNS = [
+    "ROA", "ROE", "net_margin", "current_ratio", "cash_ratio", "debt_to_equity", "revenue_growth",
+    "inflation_YoY", "gdp_growth_rate", "interest_rate"
+]
+CATEGORY_COLUMNS = ["company", "quarter"]
+SCHEMA = {**{column: np.float64 for column in FLOAT_COLUMNS}, **{column: "category" for column in CATEGORY_COLUMNS}}
+
+
+def read_unified(path, chunksize=None):
+    options = {"sep": ";", "decimal": ",", "dtype": SCHEMA, "parse_dates": ["date"]}
+    if chunksize is None:
+        return pd.read_csv(path, **options)
+
+    # streamed: only the typed arrays of the chunks are kept, never the text of the whole file;
+    # categories of the chunks differ, so the category columns are unioned at the end
+    chunks = list(pd.read_csv(path, chunksize=chunksize, **options))
+    df = pd.concat([chunk.drop(columns=CATEGORY_COLUMNS) for chunk in chunks], ignore_index=True)
+    for column in CATEGORY_COLUMNS:
+        df[column] = pd.api.types.union_categoricals([chunk[column] for chunk in chunks])
+    return df[chunks[0].columns]
+
+
+def source_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def load_unified(path, cache_dir=None, columns=None, companies=None, chunksize=None):
+    # parse once per version of the file (size + modification time), then read the columnar cache
+    cache_dir = cache_dir or os.path.splitext(path)[0] + "_cache"
+    # "float64": caches written before hold float32 ratios
+    version = f"{source_version(path)}-float64"
+    meta = read_meta(cache_dir)
+    if meta is None or meta["version"] != version:
+        start = time.perf_counter()
+        write_store(read_unified(path, chunksize), cache_dir, version, np.float64)
+        print(f" {path} analysé en {time.perf_counter() - start:.2f}s -> {cache_dir}")
+    return load_feature_store(cache_dir, columns, companies)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parse dataset_unified.csv once into a typed columnar cache.")
+    parser.add_argument("--data", default="dataset_unified.csv")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--chunksize", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    df = load_unified(args.data, args.cache_dir, chunksize=args.chunksize)
+    print(f" {len(df)} lignes chargées en {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,140 @@
+import argparse
+import itertools
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, JOINT, JOINT_FEATURES, load_company, window_rows
+from feature_store import load_dataset
+from model_registry import ModelRegistry
+from numpy_autoencoder import BatchedAutoencoder
+
+# Latent-space map: the bottleneck coordinates of every bank's quarters under the latest registered models,
+# plus the precomputed layers read by the dashboard (app_streamlit/pages/7_Latent_space_map.py):
+#   latent_points.csv  - every anomaly and a bounded sample of the normal quarters, per model, with every code
+#                        dimension (latent1..latentN: 2 for the indicator models, 4 for the joint ones)
+#   latent_density.csv - 2-D histogram of all quarters with the anomaly count per cell, per model, pair of code
+#                        dimensions and bank
+
+
+def model_inputs(df_company, indicator):
+    # raw rows fed to a registered model: <indicator>, <indicator>_w<W> (windowed) or joint;
+    # df_company comes from load_company, oldest quarter first, as the windows expect
+    if indicator == JOINT:
+        return df_company[JOINT_FEATURES].values
+    match = re.fullmatch(r"(\w+?)_w(\d+)", indicator)
+    if match:
+        return window_rows(df_company[FEATURES_BY_SCORE[match.group(1)]].values, int(match.group(2)))
+    return df_company[FEATURES_BY_SCORE[indicator]].values
+
+
+def architecture(model):
+    return tuple(W.shape for W, _ in model["layers"])
+
+
+def encode_all(frames, registry):
+    # every (company, model) pair of the same architecture goes through one stacked forward pass
+    entries = []
+    for company, df_company in frames.items():
+        for indicator in registry.indicators(company):
+            model = registry.load(company, indicator)
+            X = (model_inputs(df_company, indicator) - model["scaler_mean"]) / model["scaler_scale"]
+            entries.append((company, indicator, model, X))
+
+    rows = []
+    for shape in sorted({architecture(model) for _, _, model, _ in entries}):
+        group = [entry for entry in entries if architecture(entry[2]) == shape]
+        batched = BatchedAutoencoder(len(group), input_dim=shape[0][0], encoding_dim=shape[1][1])
+        batched.weights = [np.stack([model["layers"][l][0] for _, _, model, _ in group]) for l in range(len(shape))]
+        batched.biases = [np.stack([model["layers"][l][1] for _, _, model, _ in group])[:, None, :]
+                          for l in range(len(shape))]
+        X_preds, codes = batched.predict_with_codes([X for _, _, _, X in group])
+
+        for (company, indicator, model, X), X_pred, code in zip(group, X_preds, codes):
+            latent = {f"latent{k + 1}": code[:, k] for k in range(code.shape[1])}
+            latent.setdefault("latent2", 0.0)
+            squared = np.square(X - X_pred)
+            mse = squared.mean(axis=1)
+            threshold = np.atleast_1d(model["threshold"])
+            # joint models: anomalous when any of their indicators is (same slicing as npz_model.reconstruction_errors)
+            is_anomaly = (squared.reshape(len(X), len(threshold), -1).mean(axis=2) > threshold).any(axis=1)
+            rows.append(pd.DataFrame({
+                "company": company,
+                "date": frames[company]["date"].values,
+                "indicator": indicator,
+                **latent,
+                "reconstruction_error": mse,
+                "is_anomaly": is_anomaly
+            }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def sample_points(df_latent, max_points=5000, seed=0):
+    # keep every anomaly, and at most max_points quarters per model overall
+    samples = []
+    for _, df_model in df_latent.groupby("indicator"):
+        anomalies = df_model[df_model["is_anomaly"]]
+        normal = df_model[~df_model["is_anomaly"]]
+        n_normal = max(0, min(len(normal), max_points - len(anomalies)))
+        samples.append(pd.concat([anomalies, normal.sample(n_normal, random_state=seed)]))
+    return pd.concat(samples, ignore_index=True)
+
+
+def latent_dims(df_model):
+    # code dimensions of one model (the columns of larger codes are empty for the others)
+    return [column for column in df_model.columns if column.startswith("latent") and df_model[column].notna().all()]
+
+
+def density_grid(df_latent, bins=40):
+    # one grid per model, pair of code dimensions and bank; the edges are shared by all the banks of a model,
+    # so the page adds up the cells of the selected banks
+    grids = []
+    for indicator, df_model in df_latent.groupby("indicator"):
+        for x_dim, y_dim in itertools.combinations(latent_dims(df_model), 2):
+            x_edges = np.linspace(df_model[x_dim].min(), df_model[x_dim].max() + 1e-9, bins + 1)
+            y_edges = np.linspace(df_model[y_dim].min(), df_model[y_dim].max() + 1e-9, bins + 1)
+            for company, df_company in df_model.groupby("company"):
+                counts, _, _ = np.histogram2d(df_company[x_dim], df_company[y_dim], [x_edges, y_edges])
+                anomalies, _, _ = np.histogram2d(df_company[x_dim], df_company[y_dim], [x_edges, y_edges],
+                                                 weights=df_company["is_anomaly"].astype(float))
+                i, j = np.nonzero(counts)
+                grids.append(pd.DataFrame({
+                    "indicator": indicator,
+                    "company": company,
+                    "x_dim": x_dim, "y_dim": y_dim,
+                    "x0": x_edges[i], "x1": x_edges[i + 1],
+                    "y0": y_edges[j], "y1": y_edges[j + 1],
+                    "count": counts[i, j].astype(int),
+                    "anomalies": anomalies[i, j].astype(int)
+                }))
+    return pd.concat(grids, ignore_index=True)
+
+
+def build_latent_map(df, registry_dir, output_dir, companies=None, max_points=5000, bins=40):
+    companies = companies or sorted(df["company"].dropna().unique())
+    frames = {company: load_company(df, company) for company in companies}
+    df_latent = encode_all(frames, ModelRegistry(registry_dir))
+
+    os.makedirs(output_dir, exist_ok=True)
+    sample_points(df_latent, max_points).to_csv(os.path.join(output_dir, "latent_points.csv"), index=False)
+    density_grid(df_latent, bins).to_csv(os.path.join(output_dir, "latent_density.csv"), index=False)
+    print(f" {len(df_latent)} trimestres projetés ({df_latent['indicator'].nunique()} modèles) -> {output_dir}")
+    return df_latent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Latent coordinates of every bank and quarter for the dashboard map.")
+    parser.add_argument("--data", default="dataset1_complet.csv", help="dataset CSV or feature store directory")
+    parser.add_argument("--companies", nargs="*", default=None)
+    parser.add_argument("--registry-dir", default="model_registry")
+    parser.add_argument("--output-dir", default="../app_streamlit/data")
+    parser.add_argument("--max-points", type=int, default=5000)
+    parser.add_argument("--bins", type=int, default=40)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    build_latent_map(load_dataset(args.data), args.registry_dir, args.output_dir, args.companies, args.max_points, args.bins)
@@ -0,0 +1,102 @@
+import os
+import re
+from collections import OrderedDict
+
+from npz_model import export_fitted, load_model, score_rows
+
+
+# file suffixes used by the old autoencoder_training_<bank>.py scripts
+COMPANY_SLUGS = {
+    "BNP Paribas": "bnp",
+    "Crédit Agricole": "ca",
+    "HSBC": "hsbc",
+    "JP Morgan Chase": "jpm",
+    "Banco Santander": "banco"
+}
+
+
+def company_slug(company):
+    if company in COMPANY_SLUGS:
+        return COMPANY_SLUGS[company]
+    return re.sub(r"[^0-9a-z]+", "_", company.lower()).strip("_")
+
+
+class ModelRegistry:
+    # Model artifacts stored as <root>/<company slug>/<indicator>/v0001.npz (weights + scaler + threshold).
+    # Models are only read from disk on first use and kept in an LRU cache bounded by max_bytes.
+
+    def __init__(self, root, max_bytes=64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+
+    def directory(self, company, indicator):
+        return os.path.join(self.root, company_slug(company), indicator)
+
+    def path(self, company, indicator, version, extension=".npz"):
+        return os.path.join(self.directory(company, indicator), f"v{version:04d}{extension}")
+
+    def indicators(self, company):
+        directory = os.path.join(self.root, company_slug(company))
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory) if self.versions(company, name))
+
+    def versions(self, company, indicator):
+        directory = self.directory(company, indicator)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(match.group(1)) for match in
+                      (re.fullmatch(r"v(\d+)\.npz", name) for name in os.listdir(directory)) if match)
+
+    def latest_version(self, company, indicator):
+        versions = self.versions(company, indicator)
+        if not versions:
+            raise KeyError(f"no model registered for {company} / {indicator}")
+        return versions[-1]
+
+    def save(self, company, indicator, weights, scaler, threshold, version=None, training_key=None):
+        if version is None:
+            versions = self.versions(company, indicator)
+            version = versions[-1] + 1 if versions else 1
+        os.makedirs(self.directory(company, indicator), exist_ok=True)
+        export_fitted(self.path(company, indicator, version), weights, scaler, threshold, training_key)
+        self._evict((company, indicator, version))
+        return version
+
+    def registered_version(self, company, indicator, training_key):
+        # latest version when it was fitted on this training data, None otherwise
+        versions = self.versions(company, indicator)
+        if versions and self.load(company, indicator, versions[-1])["training_key"] == training_key:
+            return versions[-1]
+        return None
+
+    def load(self, company, indicator, version=None):
+        if version is None:
+            version = self.latest_version(company, indicator)
+        key = (company, indicator, version)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        model = load_model(self.path(company, indicator, version))
+        size = model_nbytes(model)
+        self._cache[key] = model
+        self._cache_bytes += size
+        while self._cache_bytes > self.max_bytes and len(self._cache) > 1:
+            self._evict(next(iter(self._cache)))
+        return model
+
+    def score(self, company, indicator, rows, version=None):
+        return score_rows(self.load(company, indicator, version), rows)
+
+    def _evict(self, key):
+        model = self._cache.pop(key, None)
+        if model is not None:
+            self._cache_bytes -= model_nbytes(model)
+
+
+def model_nbytes(model):
+    return (sum(W.nbytes + b.nbytes for W, b in model["layers"])
+            + model["scaler_mean"].nbytes + model["scaler_scale"].nbytes)
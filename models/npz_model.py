@@ -0,0 +1,67 @@
+import numpy as np
+
+# Compact model artifacts: weights + StandardScaler mean/scale + calibrated threshold in one .npz file.
+# Only numpy is needed to load and score them, so the Streamlit app never has to import TensorFlow.
+
+
+def export_model(path, weights, scaler_mean, scaler_scale, threshold, training_key=None):
+    # weights in keras order: [W1, b1, W2, b2, ...]
+    arrays = {f"W{i}": np.asarray(W, dtype=np.float32) for i, W in enumerate(weights[0::2])}
+    arrays.update({f"b{i}": np.asarray(b, dtype=np.float32) for i, b in enumerate(weights[1::2])})
+    if training_key is not None:
+        # content hash of the training data (training_cache.training_key) the weights were fitted on
+        arrays["training_key"] = np.asarray(training_key)
+    np.savez(path,
+             scaler_mean=np.asarray(scaler_mean, dtype=np.float64),
+             scaler_scale=np.asarray(scaler_scale, dtype=np.float64),
+             threshold=np.asarray(threshold, dtype=np.float64),
+             **arrays)
+
+
+def export_fitted(path, weights, scaler, threshold, training_key=None):
+    export_model(path, weights, scaler.mean_, scaler.scale_, threshold, training_key)
+
+
+def load_model(path):
+    with np.load(path) as data:
+        n_layers = len([key for key in data.files if key.startswith("W")])
+        threshold = data["threshold"]
+        return {
+            "layers": [(data[f"W{i}"], data[f"b{i}"]) for i in range(n_layers)],
+            "scaler_mean": data["scaler_mean"],
+            "scaler_scale": data["scaler_scale"],
+            "threshold": float(threshold) if threshold.ndim == 0 else threshold,
+            "training_key": str(data["training_key"]) if "training_key" in data.files else None
+        }
+
+
+def forward(model, X_scaled):
+    return forward_with_code(model, X_scaled)[0]
+
+
+def forward_with_code(model, X_scaled):
+    # reconstruction and bottleneck activations (output of the encoder half) from the same pass
+    h = X_scaled
+    last = len(model["layers"]) - 1
+    for i, (W, b) in enumerate(model["layers"]):
+        h = h @ W + b
+        if i < last:
+            h = np.maximum(h, 0.0)
+        if i == len(model["layers"]) // 2 - 1:
+            code = h
+    return h, code
+
+
+def reconstruction_errors(model, X_scaled):
+    squared = np.square(X_scaled - forward(model, X_scaled))
+    if np.ndim(model["threshold"]):
+        # joint models: one error per indicator, i.e. per equal-width slice of the output
+        return squared.reshape(len(squared), len(model["threshold"]), -1).mean(axis=2)
+    return squared.mean(axis=1)
+
+
+def score_rows(model, rows):
+    # rows: raw (unscaled) feature values, shape (n_rows, n_features) or a single row
+    X = (np.atleast_2d(np.asarray(rows, dtype=np.float64)) - model["scaler_mean"]) / model["scaler_scale"]
+    mse = reconstruction_errors(model, X)
+    return mse, mse > model["threshold"]
@@ -0,0 +1,156 @@
+import numpy as np
+
+
+def relu(x):
+    return np.maximum(x, 0.0)
+
+
+class BatchedAutoencoder:
+    # Same network as anomaly_pipeline.train_autoencoder (Dense relu 2k -> k -> 2k, linear output,
+    # Adam, mse) but with n_models independent copies stored as stacked weight tensors:
+    # weights[l] has shape (n_models, fan_in, fan_out) and every training step advances all models at once.
+
+    def __init__(self, n_models, input_dim, encoding_dim=2, learning_rate=0.001, seed=None):
+        self.n_models = n_models
+        self.input_dim = input_dim
+        self.encoding_dim = encoding_dim
+        self.learning_rate = learning_rate
+        self.beta_1, self.beta_2, self.epsilon = 0.9, 0.999, 1e-7
+        self.rng = np.random.default_rng(seed)
+
+        sizes = [input_dim, encoding_dim * 2, encoding_dim, encoding_dim * 2, input_dim]
+        self.weights, self.biases = [], []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            # glorot uniform kernels and zero biases, as keras Dense
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            self.weights.append(self.rng.uniform(-limit, limit, size=(n_models, fan_in, fan_out)))
+            self.biases.append(np.zeros((n_models, 1, fan_out)))
+
+        params = self.weights + self.biases
+        self.m = [np.zeros_like(p) for p in params]
+        self.v = [np.zeros_like(p) for p in params]
+        self.t = np.zeros(n_models)
+
+    def forward(self, X):
+        # X: (n_models, n_rows, input_dim) -> list of pre-activations and activations per layer
+        h = X
+        zs, hs = [], [X]
+        n_layers = len(self.weights)
+        for layer, (W, b) in enumerate(zip(self.weights, self.biases)):
+            z = h @ W + b
+            h = z if layer == n_layers - 1 else relu(z)
+            zs.append(z)
+            hs.append(h)
+        return zs, hs
+
+    def encode(self, X):
+        _, hs = self.forward(X)
+        return hs[2]
+
+    def step(self, X, row_weights):
+        # one Adam step on mse; row_weights (n_models, n_rows) sums to 1 per active model, 0 on padding
+        zs, hs = self.forward(X)
+        grad = 2.0 * (hs[-1] - X) / self.input_dim * row_weights[:, :, None]
+
+        grads_W, grads_b = [], []
+        for layer in reversed(range(len(self.weights))):
+            grads_W.append(np.swapaxes(hs[layer], 1, 2) @ grad)
+            grads_b.append(grad.sum(axis=1, keepdims=True))
+            if layer > 0:
+                grad = (grad @ np.swapaxes(self.weights[layer], 1, 2)) * (zs[layer - 1] > 0)
+        grads = grads_W[::-1] + grads_b[::-1]
+
+        active = row_weights.sum(axis=1) > 0
+        self.t = self.t + active
+        t = np.maximum(self.t, 1)[:, None, None]
+        lr_t = self.learning_rate * np.sqrt(1 - self.beta_2 ** t) / (1 - self.beta_1 ** t)
+        mask = active[:, None, None]
+
+        params = self.weights + self.biases
+        for i, (p, g) in enumerate(zip(params, grads)):
+            self.m[i] = np.where(mask, self.beta_1 * self.m[i] + (1 - self.beta_1) * g, self.m[i])
+            self.v[i] = np.where(mask, self.beta_2 * self.v[i] + (1 - self.beta_2) * g * g, self.v[i])
+            p -= mask * lr_t * self.m[i] / (np.sqrt(self.v[i]) + self.epsilon)
+
+    def fit(self, X_list, epochs=100, batch_size=8, X_val_list=None, patience=None, restore_best_weights=True):
+        # X_list: one training matrix per model, row counts may differ
+        # batch_size: int or one batch size per model
+        # patience: stop each model separately once its validation loss stopped improving for that many epochs
+        X, valid = stack_padded(X_list, self.input_dim)
+        n_rows = valid.sum(axis=1)
+        batch_sizes = np.broadcast_to(np.asarray(batch_size), (self.n_models,))
+        max_batch = int(batch_sizes.max())
+        n_steps = int(np.ceil(n_rows / batch_sizes).max())
+        model_idx = np.arange(self.n_models)[:, None]
+
+        early_stopping = X_val_list is not None and patience is not None
+        if early_stopping:
+            X_val, valid_val = stack_padded(X_val_list, self.input_dim)
+            best_loss = np.full(self.n_models, np.inf)
+            best_params = [p.copy() for p in self.weights + self.biases]
+            wait = np.zeros(self.n_models, dtype=int)
+        running = np.ones(self.n_models, dtype=bool)
+        self.epochs_run = np.zeros(self.n_models, dtype=int)
+
+        for _ in range(epochs):
+            # independent shuffle per model, padding rows sorted to the end
+            keys = np.where(valid, self.rng.random(valid.shape), np.inf)
+            order = np.argsort(keys, axis=1)
+            for step in range(n_steps):
+                positions = step * batch_sizes[:, None] + np.arange(max_batch)[None, :]
+                in_batch = ((np.arange(max_batch)[None, :] < batch_sizes[:, None])
+                            & (positions < n_rows[:, None]) & running[:, None])
+                idx = np.take_along_axis(order, np.minimum(positions, X.shape[1] - 1), axis=1)
+                counts = in_batch.sum(axis=1, keepdims=True)
+                self.step(X[model_idx, idx], in_batch / np.maximum(counts, 1))
+            self.epochs_run += running
+
+            if early_stopping:
+                val_loss = self.loss(X_val, valid_val)
+                improved = running & (val_loss < best_loss)
+                best_loss = np.where(improved, val_loss, best_loss)
+                mask = improved[:, None, None]
+                best_params = [np.where(mask, p, best) for p, best in zip(self.weights + self.biases, best_params)]
+                wait = np.where(improved, 0, wait + running)
+                running &= wait < patience
+                if not running.any():
+                    break
+
+        if early_stopping and restore_best_weights:
+            n_layers = len(self.weights)
+            for i, best in enumerate(best_params):
+                target = self.weights[i] if i < n_layers else self.biases[i - n_layers]
+                target[...] = best
+        return self
+
+    def loss(self, X, valid):
+        _, hs = self.forward(X)
+        squared = np.square(hs[-1] - X).mean(axis=2)
+        return (squared * valid).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+
+    def get_weights(self, m):
+        # keras-style [W1, b1, W2, b2, ...] for model m
+        weights = []
+        for W, b in zip(self.weights, self.biases):
+            weights += [W[m], b[m, 0]]
+        return weights
+
+    def predict(self, X_list):
+        return self.predict_with_codes(X_list)[0]
+
+    def predict_with_codes(self, X_list):
+        # reconstructions and bottleneck codes of every model from one forward pass
+        X, valid = stack_padded(X_list, self.input_dim)
+        _, hs = self.forward(X)
+        return ([hs[-1][m, :len(x)] for m, x in enumerate(X_list)],
+                [hs[2][m, :len(x)] for m, x in enumerate(X_list)])
+
+
+def stack_padded(X_list, input_dim):
+    max_rows = max(len(x) for x in X_list)
+    X = np.zeros((len(X_list), max_rows, input_dim))
+    valid = np.zeros((len(X_list), max_rows), dtype=bool)
+    for m, x in enumerate(X_list):
+        X[m, :len(x)] = x
+        valid[m, :len(x)] = True
+    return X, valid
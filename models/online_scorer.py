@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, build_errors_frame, merge_errors
+from model_registry import company_slug
+from npz_model import score_rows
+
+
+class RunningStats:
+    # Welford running mean/variance of the raw features seen by a model
+
+    def __init__(self, n_features):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    def update(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.n) if self.n else np.zeros_like(self.mean)
+
+
+class OnlineScorer:
+    # Scores newly arriving quarters one row at a time with the models of the registry.
+    # Per (company, indicator) it only keeps the loaded model, the previous quarter's score (for the delta)
+    # and running feature statistics, so each new row costs the same whatever the length of the history.
+    # With refresh_every=n the latest registry version is reloaded every n rows (after a periodic retraining).
+
+    def __init__(self, registry, results_dir, refresh_every=None):
+        self.registry = registry
+        self.results_dir = results_dir
+        self.refresh_every = refresh_every
+        self.state = {}
+        self._columns = {}
+
+    def _state(self, company, score):
+        key = (company, score)
+        if key not in self.state:
+            self.state[key] = {
+                "model": self.registry.load(company, score),
+                "previous": None,
+                "stats": RunningStats(2),
+                "since_refresh": 0
+            }
+        return self.state[key]
+
+    def prime(self, df_company):
+        # start from the last known quarter of a bank (e.g. its anomaly results history)
+        last = df_company.sort_values("date", key=pd.to_datetime).iloc[-1]
+        for score, (score_col, _) in FEATURES_BY_SCORE.items():
+            self._state(last["company"], score)["previous"] = last[score_col]
+
+    def ingest(self, company, date, row, append=True):
+        df_errors_all = []
+        for score, (score_col, delta_col) in FEATURES_BY_SCORE.items():
+            state = self._state(company, score)
+            value = row[score_col]
+            # same convention as add_deltas and the feature store, whatever the order of the source file:
+            # change since the previous quarter, 0 without one
+            delta = 0.0 if state["previous"] is None else value - state["previous"]
+            x = np.array([value, delta], dtype=np.float64)
+
+            mse, is_anomaly = score_rows(state["model"], x)
+            df_row = pd.DataFrame({"date": [date], "company": [company], score_col: [value], delta_col: [delta]})
+            df_errors_all.append(build_errors_frame(df_row, score, mse, state["model"]["threshold"]))
+
+            state["previous"] = value
+            state["stats"].update(x)
+            state["since_refresh"] += 1
+            if self.refresh_every and state["since_refresh"] >= self.refresh_every:
+                self.refresh(company, score)
+
+        df_new = merge_errors(df_errors_all)
+        if append:
+            self.append(company, df_new)
+        return df_new
+
+    def refresh(self, company, score):
+        state = self._state(company, score)
+        state["model"] = self.registry.load(company, score)
+        state["since_refresh"] = 0
+
+    def scaler_drift(self, company, score):
+        # running mean of the features seen online, in units of the model's training scaler
+        state = self._state(company, score)
+        return (state["stats"].mean - state["model"]["scaler_mean"]) / state["model"]["scaler_scale"]
+
+    def append(self, company, df_new):
+        # append to the anomaly results store without rewriting the history already in it
+        path = os.path.join(self.results_dir, f"anomaly_results_{company_slug(company)}.csv")
+        if os.path.exists(path):
+            if path not in self._columns:
+                self._columns[path] = pd.read_csv(path, nrows=0).columns
+            df_new.reindex(columns=self._columns[path]).to_csv(path, mode="a", header=False, index=False)
+        else:
+            os.makedirs(self.results_dir, exist_ok=True)
+            df_new.to_csv(path, index=False)
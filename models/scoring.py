@@ -0,0 +1,207 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from feature_store import load_dataset, load_feature_store, read_meta, write_store
+from healthy_periods import dataset_version
+
+# Local / global percentile scores of score_global_local.ipynb (the source of dataset1_complet.csv):
+#   <ratio>_pct        rank of the ratio within the company's whole history (groupby("company").rank(pct=True))
+#   <ratio>_pct_global rank of the ratio among all companies of the same quarter (groupby("quarter").rank(pct=True)),
+#                      debt_to_equity inverted (1 - pct) for solvency
+# and the four composite scores of each. All ranks are computed in one pass over the (rows, ratios) array.
+
+RATIOS = ["ROA", "ROE", "net_margin", "current_ratio", "cash_ratio", "debt_to_equity"]
+
+
+def group_codes(keys):
+    # integer code per group, -1 for a missing key (pandas groupby drops those rows)
+    codes, _ = pd.factorize(pd.Series(keys), use_na_sentinel=True)
+    return codes
+
+
+def percentile_ranks(values, codes):
+    # pandas rank(method="average", pct=True) of every column of values within each group of codes, NaN kept as NaN.
+    # The columns are ranked together by treating (group, column) as one sort key.
+    n, k = values.shape
+    keys = (codes[:, None] * k + np.arange(k)).ravel()
+    flat = values.ravel()
+    valid = ~np.isnan(flat) & (keys >= 0)
+    keys, flat, positions = keys[valid], flat[valid], np.flatnonzero(valid)
+
+    # sort by value, then stable sort by key (integer sort, much faster than lexsort on the pair)
+    order = np.argsort(flat)
+    order = order[np.argsort(keys[order], kind="stable")]
+    sorted_keys, sorted_values = keys[order], flat[order]
+    new_key = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    new_run = new_key | np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+
+    # position inside the group, then the average position of each run of ties
+    index = np.arange(len(order))
+    group_start = np.maximum.accumulate(np.where(new_key, index, 0))
+    run_id = np.cumsum(new_run) - 1
+    run_start = index[new_run] - group_start[new_run]
+    run_stop = np.r_[index[new_run][1:], len(order)] - group_start[new_run]
+    average_rank = (run_start + run_stop + 1) / 2
+    group_size = np.diff(np.r_[np.flatnonzero(new_key), len(order)])
+
+    group_id = np.cumsum(new_key) - 1
+
+    ranks = np.full(n * k, np.nan)
+    ranks[positions[order]] = average_rank[run_id] / group_size[group_id]
+    return ranks.reshape(n, k)
+
+
+def sorted_ranks(sorted_values, values):
+    # same average percentile rank, against an already sorted history (no NaN) that contains values
+    left = np.searchsorted(sorted_values, values, side="left")
+    right = np.searchsorted(sorted_values, values, side="right")
+    return np.where(np.isnan(values), np.nan, (left + right + 1) / 2 / len(sorted_values))
+
+
+def row_mean(*columns):
+    # mean(axis=1) of pandas: missing values skipped, NaN only when every value is missing
+    stacked = np.column_stack(columns)
+    counts = (~np.isnan(stacked)).sum(axis=1)
+    with np.errstate(invalid="ignore"):
+        return np.where(counts > 0, np.nansum(stacked, axis=1) / counts, np.nan)
+
+
+def local_scores(local_pct):
+    roa, roe, net_margin, current_ratio, cash_ratio, debt_to_equity = local_pct.T
+    inv_debt = 1 - debt_to_equity
+    return {
+        "score_profitability_local": row_mean(roa, roe, net_margin),
+        "score_liquidity_local": row_mean(current_ratio, cash_ratio),
+        "score_solvency_local": inv_debt,
+        "inv_debt_pct": inv_debt,
+        "score_leverage_adjusted_local": row_mean(roe, inv_debt)
+    }
+
+
+def global_scores(global_pct):
+    roa_g, roe_g, net_margin_g, current_ratio_g, cash_ratio_g, inv_debt_g = global_pct.T
+    return {
+        "score_profitability_global": row_mean(roa_g, roe_g, net_margin_g),
+        "score_liquidity_global": row_mean(current_ratio_g, cash_ratio_g),
+        "score_solvency_global": inv_debt_g,
+        "score_leverage_adjusted_global": row_mean(roe_g, inv_debt_g)
+    }
+
+
+def score_columns(local_pct, global_pct):
+    # columns in the order the notebook creates them, as written to dataset1_complet.csv:
+    # local percentiles, local scores (+ inv_debt_pct), global percentiles, global scores
+    columns = {f"{ratio}_pct": local_pct[:, j] for j, ratio in enumerate(RATIOS)}
+    columns.update(local_scores(local_pct))
+    columns.update({f"{ratio}_pct_global": global_pct[:, j] for j, ratio in enumerate(RATIOS)})
+    columns.update(global_scores(global_pct))
+    return pd.DataFrame(columns)
+
+
+def global_percentiles(values, quarters):
+    global_pct = percentile_ranks(values, group_codes(quarters))
+    global_pct[:, RATIOS.index("debt_to_equity")] = 1 - global_pct[:, RATIOS.index("debt_to_equity")]
+    return global_pct
+
+
+def score_panel(df):
+    values = df[RATIOS].to_numpy(dtype=float)
+    local_pct = percentile_ranks(values, group_codes(df["company"]))
+    global_pct = global_percentiles(values, df["quarter"])
+    df = df.drop(columns=[column for column in df.columns if column.endswith(("_pct", "_pct_global"))
+                          or column.startswith("score_") or column == "inv_debt_pct"])
+    return pd.concat([df.reset_index(drop=True), score_columns(local_pct, global_pct)], axis=1)
+
+
+class IncrementalScorer:
+    # Keeps the scored panel. A new quarter (one row per company) only reranks that quarter across companies;
+    # in each company's history the new value is inserted rank-wise: an older value moves up by 1 when the
+    # new one is below it (1/2 on a tie), and the new value's rank is the count of older values below / equal.
+    # Everything is a few vectorized passes over the rows of the companies concerned, no sort of the panel.
+
+    def __init__(self, df):
+        self.panel = score_panel(df)
+
+    def add_quarter(self, df_quarter):
+        quarter = df_quarter["quarter"].iloc[0]
+        n_old = len(self.panel)
+        # rows of the new quarter are appended with empty scores, filled below
+        self.panel = pd.concat([self.panel, df_quarter], ignore_index=True)
+        codes = group_codes(self.panel["company"])
+        values = self.panel[RATIOS].to_numpy(dtype=float)
+        local_pct = self.panel[[f"{ratio}_pct" for ratio in RATIOS]].to_numpy(dtype=float, copy=True)
+
+        # new row of each company, and the older rows of those companies
+        new_rows = np.arange(n_old, len(self.panel))
+        new_row_of = np.full(codes.max() + 1, -1)
+        new_row_of[codes[new_rows]] = new_rows
+        old_rows = np.flatnonzero((new_row_of[codes[:n_old]] >= 0) & (codes[:n_old] >= 0))
+        old = values[old_rows]
+        new = values[new_row_of[codes[old_rows]]]
+        n_codes = len(new_row_of)
+
+        # history sizes before the insertion and the 1-based average ranks they give back from the stored pct
+        n_before = np.column_stack([np.bincount(codes[old_rows], ~np.isnan(old[:, j]), n_codes) for j in range(len(RATIOS))])
+        ranks = np.round(local_pct[old_rows] * n_before[codes[old_rows]] * 2) / 2
+        n_after = n_before + ~np.isnan(values[new_row_of.clip(0)])
+
+        local_pct[old_rows] = (ranks + (new < old) + 0.5 * (new == old)) / n_after[codes[old_rows]]
+        below = np.column_stack([np.bincount(codes[old_rows], new[:, j] > old[:, j], n_codes) for j in range(len(RATIOS))])
+        equal = np.column_stack([np.bincount(codes[old_rows], new[:, j] == old[:, j], n_codes) for j in range(len(RATIOS))])
+        new_codes = codes[new_rows]
+        local_pct[new_rows] = np.where(np.isnan(values[new_rows]), np.nan,
+                                       (below[new_codes] + equal[new_codes] / 2 + 1) / n_after[new_codes])
+
+        global_pct = self.panel[[f"{ratio}_pct_global" for ratio in RATIOS]].to_numpy(dtype=float, copy=True)
+        in_quarter = (self.panel["quarter"] == quarter).to_numpy()
+        global_pct[in_quarter] = global_percentiles(values[in_quarter], self.panel.loc[in_quarter, "quarter"])
+
+        scores = score_columns(local_pct, global_pct)
+        self.panel[scores.columns] = scores.values
+        return self.panel[in_quarter]
+
+
+def write_scores(df, store_path, csv_path=None):
+    # the scores are stored column by column, rows grouped by company (feature_store.write_store), so the
+    # dashboard pages read only the columns and banks they display; the CSV is an optional export.
+    # float64 like the CSV: the alerts and status rules compare these values with their thresholds
+    df_scores = score_panel(df)
+    df_scores["date"] = pd.to_datetime(df_scores["date"])
+    write_store(df_scores, store_path, dataset_version(df), np.float64)
+    print(f" Scores locaux et globaux écrits : {store_path} ({len(df_scores)} lignes)")
+    if csv_path:
+        df_scores.to_csv(csv_path, index=False)
+        print(f" Export CSV : {csv_path}")
+    return df_scores
+
+
+def load_scores(store_path, columns=None, companies=None, csv_path=None):
+    # projection (columns) and company selection are done on the store; the CSV fallback reads the same subset
+    if read_meta(store_path) is not None:
+        return load_feature_store(store_path, columns, companies)
+    header = pd.read_csv(csv_path, nrows=0).columns
+    df = pd.read_csv(csv_path, usecols=columns, parse_dates=["date"] if "date" in (columns or header) else None)
+    return df if companies is None else df[df["company"].isin(companies)].reset_index(drop=True)
+
+
+def score_companies(store_path, csv_path=None):
+    # banks of the store without reading any column
+    meta = read_meta(store_path)
+    if meta is not None:
+        return sorted(meta["offsets"])
+    return sorted(pd.read_csv(csv_path, usecols=["company"])["company"].dropna().unique())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local and global percentile scores for the dashboard.")
+    parser.add_argument("--data", default="dataset_unified.csv", help="raw ratios (';' and decimal commas accepted)")
+    parser.add_argument("--output", default="../app_streamlit/scores_store", help="columnar scores store")
+    parser.add_argument("--csv", default=None, help="optional CSV export (dataset1_complet.csv layout)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    write_scores(load_dataset(args.data), args.output, args.csv)
@@ -0,0 +1,136 @@
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, HYPERPARAMS, adaptive_batch_size, load_company, prepare_indicator
+from feature_store import load_dataset
+
+
+# values tried for each setting that used to be hard-coded in the training scripts
+SEARCH_SPACE = {
+    "encoding_dim": [1, 2, 3],
+    "p_low": [0.05, 0.10, 0.15],
+    "p_high": [0.85, 0.90, 0.95],
+    "threshold_percentile": [90, 95, 99]
+}
+
+
+def grid_trials(space):
+    return [dict(zip(space, values)) for values in itertools.product(*space.values())]
+
+
+def random_trials(space, n_trials, seed=None):
+    rng = np.random.default_rng(seed)
+    trials = {}
+    while len(trials) < min(n_trials, int(np.prod([len(values) for values in space.values()]))):
+        trial = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        trials[trial_id(trial)] = trial
+    return list(trials.values())
+
+
+def trial_id(trial):
+    return hashlib.sha1(json.dumps(trial, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def run_trial(frames, trial, seed=None):
+    # one trial = every (company, indicator) model trained in a single batched numpy fit
+    from numpy_autoencoder import BatchedAutoencoder
+
+    hyperparams = dict(HYPERPARAMS, encoding_dim=trial["encoding_dim"])
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        jobs = [prepare_indicator(df_company, score, seed, "numpy", hyperparams, trial["p_low"], trial["p_high"])
+                for df_company in frames.values() for score in FEATURES_BY_SCORE]
+
+    start = time.perf_counter()
+    model = BatchedAutoencoder(len(jobs), input_dim=2, encoding_dim=hyperparams["encoding_dim"],
+                               learning_rate=hyperparams["learning_rate"], seed=seed)
+    model.fit([job["X_tr"] for job in jobs], epochs=hyperparams["epochs"],
+              batch_size=np.array([adaptive_batch_size(len(job["X_tr"])) for job in jobs]),
+              X_val_list=[job["X_val"] for job in jobs], patience=hyperparams["patience"],
+              restore_best_weights=hyperparams["restore_best_weights"])
+    fit_seconds = time.perf_counter() - start
+
+    X_preds = model.predict([job["X_full"] for job in jobs])
+    X_val_preds = model.predict([job["X_val"] for job in jobs])
+
+    rows = []
+    for m, (job, X_pred, X_val_pred) in enumerate(zip(jobs, X_preds, X_val_preds)):
+        mse = np.mean(np.square(job["X_full"] - X_pred), axis=1)
+        mse_val = np.mean(np.square(job["X_val"] - X_val_pred), axis=1)
+        threshold = np.percentile(mse_val, trial["threshold_percentile"])
+        rows.append({
+            "trial_id": trial_id(trial),
+            **trial,
+            "company": job["company"],
+            "indicator": job["score"],
+            "n_healthy": len(job["X_train"]),
+            "epochs": int(model.epochs_run[m]),
+            "fit_seconds": fit_seconds / len(jobs),
+            "val_mse": float(mse_val.mean()),
+            "threshold": float(threshold),
+            "n_anomalies": int((mse > threshold).sum())
+        })
+    return rows
+
+
+def completed_trials(results_path):
+    if not os.path.exists(results_path):
+        return set()
+    return set(pd.read_csv(results_path, usecols=["trial_id"])["trial_id"])
+
+
+def run_sweep(frames, trials, results_path, workers=None, seed=None):
+    # results_path is also the checkpoint: every finished trial is appended to it, so a rerun only
+    # runs the trials that are not in the file yet
+    done = completed_trials(results_path)
+    todo = [trial for trial in trials if trial_id(trial) not in done]
+    print(f" {len(trials) - len(todo)} trials already done, {len(todo)} to run.")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_trial, frames, trial, seed) for trial in todo]
+        for future in as_completed(futures):
+            df_trial = pd.DataFrame(future.result())
+            df_trial.to_csv(results_path, mode="a", index=False, header=not os.path.exists(results_path))
+            print(f" trial {df_trial['trial_id'].iloc[0]} : val_mse={df_trial['val_mse'].mean():.4f}, "
+                  f"{df_trial['n_anomalies'].sum()} anomalies")
+
+    return summarize(pd.read_csv(results_path))
+
+
+def summarize(df_results):
+    params = list(SEARCH_SPACE)
+    return (df_results.groupby(["trial_id"] + params)
+            .agg(val_mse=("val_mse", "mean"), n_anomalies=("n_anomalies", "sum"),
+                 fit_seconds=("fit_seconds", "sum"), epochs=("epochs", "mean"))
+            .reset_index()
+            .sort_values("val_mse"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Grid or random search over the anomaly detector settings.")
+    parser.add_argument("--data", default="dataset1_complet.csv", help="dataset CSV or feature store directory")
+    parser.add_argument("--companies", nargs="*", default=None)
+    parser.add_argument("--results", default="sweep_results.csv")
+    parser.add_argument("--random", type=int, default=None, help="number of random trials (default: full grid)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    df = load_dataset(args.data)
+    companies = args.companies or sorted(df["company"].dropna().unique())
+    frames = {company: load_company(df, company) for company in companies}
+    trials = random_trials(SEARCH_SPACE, args.random, args.seed) if args.random else grid_trials(SEARCH_SPACE)
+    print(run_sweep(frames, trials, args.results, args.workers, args.seed).head(10).to_string(index=False))
@@ -0,0 +1,132 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from anomaly_pipeline import FEATURES_BY_SCORE, JOINT, WINDOWS, fit_companies_numpy, fit_ensemble_numpy, fit_indicator, \
+    load_company, merge_errors
+from feature_store import load_dataset
+from healthy_periods import STRATEGIES, healthy_masks, masks_frame
+from model_registry import company_slug
+from training_matrix import TrainingMatrix, write_training_matrix
+
+
+def init_worker(intra_op_threads):
+    # one small model per process: keep TensorFlow from spawning a thread pool per core in every worker
+    os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def fit_matrix_indicator(matrix_dir, company, score, *args):
+    # worker side: memory-map the shared training matrix instead of receiving a pickled frame
+    return fit_indicator(TrainingMatrix(matrix_dir).company_frame(company), score, *args)
+
+
+def train_keras_jobs(frames, jobs, registry_dir, cache_dir, seed, workers, intra_op_threads, healthy, windows,
+                     matrix_dir=None):
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker,
+                             initargs=(intra_op_threads,)) as pool:
+        futures = {}
+        for company, score in jobs:
+            args = (score, registry_dir, cache_dir, seed, healthy[company], windows.get(score))
+            if matrix_dir:
+                futures[(company, score)] = pool.submit(fit_matrix_indicator, matrix_dir, company, *args)
+            else:
+                futures[(company, score)] = pool.submit(fit_indicator, frames[company], *args)
+        return {key: future.result() for key, future in futures.items()}
+
+
+def train_companies(df, companies, output_dir, registry_dir="model_registry", workers=None, intra_op_threads=1,
+                    backend="keras", cache_dir="training_cache", seed=None, joint=False,
+                    ensemble=None, healthy_strategy="quantile", healthy_cache_dir="healthy_cache", windows=None,
+                    matrix_dir=None):
+    if matrix_dir:
+        # float32 features of every bank in one memory-mapped file, read in place by the main process and the workers
+        matrix = write_training_matrix(df, matrix_dir, companies)
+        frames = {company: matrix.company_frame(company) for company in companies}
+    else:
+        frames = {company: load_company(df, company) for company in companies}
+    # healthy periods of every bank in one pass, shared by all the models (and exported for the app)
+    healthy = healthy_masks(frames, healthy_strategy, healthy_cache_dir)
+    scores = [JOINT] if joint else list(FEATURES_BY_SCORE)
+    jobs = [(company, score) for company in companies for score in scores]
+    workers = workers or os.cpu_count()
+    windows = windows or {}
+
+    start = time.perf_counter()
+    if ensemble:
+        # seed ensembles always use the batched numpy engine
+        results = dict(zip(jobs, fit_ensemble_numpy(frames, ensemble, scores, seed, healthy, windows)))
+        workers, backend = 1, f"numpy, ensemble of {ensemble}"
+    elif backend == "numpy":
+        # a single vectorized fit for every (company, indicator) model, no process pool needed
+        results = dict(zip(jobs, fit_companies_numpy(frames, scores, seed=seed, registry_dir=registry_dir,
+                                                       cache_dir=cache_dir, healthy=healthy, windows=windows)))
+        workers = 1
+    else:
+        results = train_keras_jobs(frames, jobs, registry_dir, cache_dir, seed, workers, intra_op_threads, healthy,
+                                   windows, matrix_dir)
+
+    fit_stats = [df_errors.attrs["fit_stats"] for df_errors in results.values()]
+    epochs_run = sum(stats["epochs"] for stats in fit_stats)
+    epochs_budget = sum(stats["max_epochs"] for stats in fit_stats)
+    print(f"\n {epochs_run}/{epochs_budget} epochs run ({1 - epochs_run / epochs_budget:.0%} saved), "
+          f"{sum(stats['seconds'] for stats in fit_stats):.1f}s of fitting.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    for company in companies:
+        df_errors_merged = merge_errors([results[(company, score)] for score in scores])
+        output_path = os.path.join(output_dir, f"anomaly_results_{company_slug(company)}.csv")
+        df_errors_merged.to_csv(output_path, index=False)
+        print(f" {company} -> {output_path}")
+    masks_frame(frames, healthy).to_csv(os.path.join(output_dir, "healthy_periods.csv"), index=False)
+
+    print(f"\n {len(jobs)} models processed in {time.perf_counter() - start:.1f}s with {workers} workers ({backend}).")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the autoencoder anomaly models for several banks in parallel.")
+    parser.add_argument("--data", default="dataset1_complet.csv", help="dataset CSV or feature store directory")
+    parser.add_argument("--companies", nargs="*", default=None,
+                        help="companies to train (default: all companies in the dataset)")
+    parser.add_argument("--output-dir", default="../app_streamlit/data")
+    parser.add_argument("--registry-dir", default="model_registry")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--intra-op-threads", type=int, default=1)
+    parser.add_argument("--backend", choices=["keras", "numpy"], default="keras")
+    parser.add_argument("--cache-dir", default="training_cache")
+    parser.add_argument("--no-cache", action="store_true", help="refit every model even if its training data did not change")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--joint", action="store_true", help="one model per bank over all eight score/delta features")
+    parser.add_argument("--ensemble", type=int, default=None,
+                        help="train this many differently initialised copies of each model and report mean/std error")
+    parser.add_argument("--healthy-strategy", choices=sorted(STRATEGIES), default="quantile",
+                        help="how the healthy (training) quarters are selected")
+    parser.add_argument("--healthy-cache-dir", default="healthy_cache")
+    parser.add_argument("--matrix-dir", default=None,
+                        help="write/reuse a memory-mapped float32 training matrix here and have workers read from it")
+    parser.add_argument("--windows", nargs="*", default=None, metavar="INDICATOR=W",
+                        help="windowed models over the last W quarters (default W per indicator: anomaly_pipeline.WINDOWS)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    df = load_dataset(args.data)
+    companies = args.companies or sorted(df["company"].dropna().unique())
+    windows = None
+    if args.windows is not None:
+        windows = dict(WINDOWS, **{indicator: int(w) for indicator, w in (item.split("=") for item in args.windows)})
+    train_companies(df, companies, args.output_dir, args.registry_dir, args.workers, args.intra_op_threads,
+                    args.backend, None if args.no_cache else args.cache_dir, args.seed, args.joint,
+                    args.ensemble, args.healthy_strategy, args.healthy_cache_dir, windows,
+                    args.matrix_dir)
@@ -0,0 +1,40 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from npz_model import export_fitted, load_model
+
+
+def training_key(X_train, hyperparams, seed=None, backend="keras"):
+    # content hash of the healthy-period training matrix + everything else that changes the fit
+    X_train = np.ascontiguousarray(X_train, dtype=np.float64)
+    digest = hashlib.sha256()
+    digest.update(str(X_train.shape).encode())
+    digest.update(X_train.tobytes())
+    digest.update(json.dumps({"hyperparams": hyperparams, "seed": seed, "backend": backend}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class TrainingCache:
+    # <root>/<key>.npz, same artifact format as the model registry
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.npz")
+
+    def get(self, key):
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return load_model(path)
+
+    def put(self, key, weights, scaler, threshold):
+        os.makedirs(self.root, exist_ok=True)
+        # write then rename so parallel workers never read a half-written artifact
+        tmp_path = self.path(key) + f".{os.getpid()}.tmp.npz"
+        export_fitted(tmp_path, weights, scaler, threshold)
+        os.replace(tmp_path, self.path(key))
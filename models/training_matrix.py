@@ -0,0 +1,81 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import JOINT_FEATURES, load_company
+from healthy_periods import MACRO_COLUMNS, dataset_version
+
+# The model features of every company as one float32 (n_rows, n_features) .npy, rows grouped by company,
+# with the dates next to it and an offset index. Processes open it with mmap_mode="r", so parallel workers
+# share the pages through the OS cache instead of each unpickling its own copy of the data.
+# The macro columns are stored next to the model features: the "macro" healthy-period strategy reads them.
+MATRIX_FEATURES = JOINT_FEATURES + MACRO_COLUMNS
+
+
+class TrainingMatrix:
+
+    def __init__(self, path):
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        self.path = path
+        self.version = index["version"]
+        self.features = index["features"]
+        self.offsets = index["offsets"]
+        self.matrix = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+        self.dates = np.load(os.path.join(path, "dates.npy"), mmap_mode="r")
+
+    @property
+    def companies(self):
+        return list(self.offsets)
+
+    def company_frame(self, company):
+        # a frame over the memory-mapped rows of one company (no copy of the feature values),
+        # indexed by row number in the matrix so that frames of different companies never share labels
+        start, stop = self.offsets[company]
+        df_company = pd.DataFrame(self.matrix[start:stop], index=pd.RangeIndex(start, stop), columns=self.features,
+                                  copy=False)
+        df_company.insert(0, "company", company)
+        df_company.insert(0, "date", self.dates[start:stop])
+        return df_company
+
+
+def write_training_matrix(df, path, companies=None):
+    # no-op when the matrix already holds this version of the dataset and these companies
+    companies = companies or sorted(df["company"].dropna().unique())
+    # "chronological": matrices written before load_company sorted the quarters hold file-order deltas
+    version = f"{dataset_version(df)}-chronological"
+    index_path = os.path.join(path, "index.json")
+    if os.path.exists(index_path):
+        existing = TrainingMatrix(path)
+        if existing.version == version and existing.companies == list(companies) \
+                and existing.features == MATRIX_FEATURES:
+            print(f" Matrice d'entraînement à jour : {path}")
+            return existing
+
+    os.makedirs(path, exist_ok=True)
+    sizes = df["company"].value_counts()
+    n_rows = int(sum(sizes[company] for company in companies))
+    # filled one company at a time: the whole universe is never held in memory as float64 frames
+    matrix = np.lib.format.open_memmap(os.path.join(path, "features.npy"), mode="w+", dtype=np.float32,
+                                       shape=(n_rows, len(MATRIX_FEATURES)))
+    dates = np.lib.format.open_memmap(os.path.join(path, "dates.npy"), mode="w+", dtype="datetime64[ns]", shape=(n_rows,))
+
+    offsets, start = {}, 0
+    for company in companies:
+        df_company = load_company(df, company)
+        stop = start + len(df_company)
+        matrix[start:stop] = df_company[MATRIX_FEATURES].values
+        dates[start:stop] = pd.to_datetime(df_company["date"]).values
+        offsets[company] = [start, stop]
+        start = stop
+    matrix.flush()
+    dates.flush()
+    del matrix, dates
+
+    # index.json is written last: a matrix without it is incomplete
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "features": MATRIX_FEATURES, "offsets": offsets}, f, ensure_ascii=False, indent=1)
+    print(f" Matrice d'entraînement écrite : {path} ({n_rows} lignes)")
+    return TrainingMatrix(path)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# the models and the app are flat script directories, imported by module name
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "models"))
+sys.path.insert(0, os.path.join(ROOT, "app_streamlit"))
+
+from anomaly_pipeline import FEATURES_BY_SCORE  # noqa: E402
+from healthy_periods import MACRO_COLUMNS  # noqa: E402
+
+
+def synthetic_panel(companies=("Bank A", "Bank B"), n_quarters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for company in companies:
+        df_company = pd.DataFrame({"company": company,
+                                   "date": pd.date_range("2010-03-31", periods=n_quarters, freq="QE")})
+        for score_col, _ in FEATURES_BY_SCORE.values():
+            df_company[score_col] = rng.random(n_quarters)
+        for column in MACRO_COLUMNS:
+            df_company[column] = rng.normal(size=n_quarters)
+        frames.append(df_company)
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def panel():
+    # two banks, 40 quarters of random local scores and macro variables
+    return synthetic_panel()
+
+
+@pytest.fixture
+def newest_first_panel(panel):
+    # layout of dataset1_complet.csv: each bank's newest quarter first, dates as text
+    return panel.assign(date=panel["date"].dt.strftime("%Y-%m-%d")).iloc[::-1].reset_index(drop=True)
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, load_company
+from backtest import backtest_company
+
+
+def test_no_fold_reads_a_later_quarter(newest_first_panel):
+    df = newest_first_panel
+    company, min_history = "Bank A", 30
+    baseline = backtest_company(load_company(df, company), min_history=min_history, warm_epochs=2, seed=0)
+
+    # change one quarter: every quarter scored before it must come out exactly the same
+    changed_date = sorted(df.loc[df["company"] == company, "date"])[min_history + 5]
+    changed = df.copy()
+    rows = (changed["company"] == company) & (changed["date"] == changed_date)
+    score_cols = [score_col for score_col, _ in FEATURES_BY_SCORE.values()]
+    changed.loc[rows, score_cols] += 0.5
+    result = backtest_company(load_company(changed, company), min_history=min_history, warm_epochs=2, seed=0)
+
+    before = pd.to_datetime(baseline["date"]) < pd.Timestamp(changed_date)
+    assert before.sum() == 5
+    pd.testing.assert_frame_equal(result[before], baseline[before])
+    assert not result[~before].equals(baseline[~before])
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from anomaly_pipeline import bootstrap_threshold, fit_detector, load_company, prepare_indicator
+from detectors import DETECTORS, Detector, make_detector
+
+
+def test_detector_without_score_cannot_be_built():
+    class NoScore(Detector):
+        name = "no_score"
+
+    with pytest.raises(TypeError):
+        NoScore()
+
+
+@pytest.mark.parametrize("name", sorted(set(DETECTORS) - {"autoencoder"}))
+def test_benchmark_and_pipeline_use_the_same_threshold(panel, name):
+    df_company = load_company(panel, "Bank A")
+    job = prepare_indicator(df_company, "profitability", seed=0)
+    kwargs = {"seed": 0} if name == "isolation_forest" else {}
+    detector = make_detector(name, **kwargs).fit(job["X_tr"], job["X_val"])
+    threshold = detector.calibrate(job["X_val"], seed=0)
+
+    assert (threshold, detector.threshold_ci) == bootstrap_threshold(detector.score(job["X_val"]), seed=0)
+    df_errors = fit_detector(df_company, "profitability", name, seed=0)
+    np.testing.assert_allclose(df_errors["threshold_profitability"], threshold)
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from anomaly_pipeline import JOINT_FEATURES, load_company
+from feature_store import build_feature_store, load_dataset
+
+
+def test_store_and_csv_give_the_same_model_frames(tmp_path, newest_first_panel):
+    csv_path, store_path = tmp_path / "dataset1_complet.csv", tmp_path / "feature_store"
+    newest_first_panel.to_csv(csv_path, index=False)
+    df_csv = load_dataset(str(csv_path))
+    build_feature_store(df_csv, str(store_path))
+
+    columns = ["company", "date"] + JOINT_FEATURES
+    for company in sorted(df_csv["company"].unique()):
+        from_csv = load_company(df_csv, company)[columns].reset_index(drop=True)
+        from_store = load_company(load_dataset(str(store_path), companies=[company]), company)[columns]
+        # only the dtypes of the labels differ (category / ns dates in the store)
+        labels = {column: from_csv[column].dtype for column in ["company", "date"]}
+        from_store = from_store.reset_index(drop=True).astype(labels)
+        pd.testing.assert_frame_equal(from_store, from_csv, check_exact=True)
@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+from group_models import prepare_group
+
+
+def test_group_delta_is_positive_when_the_bank_improves():
+    df_company = pd.DataFrame({"company": "Bank A", "date": pd.date_range("2010-03-31", periods=6, freq="QE"),
+                               "debt_to_equity": [10.0, 10, 12, 12, 12, 9],
+                               "current_ratio": [1.0, 1, 1, 1.3, 1.3, 1.3]})
+    delta = prepare_group(df_company, "solvabilité")["frame"]["delta_solvabilité"].values
+    # more debt is a deterioration, a higher current ratio or less debt an improvement
+    assert delta[2] < 0
+    assert delta[3] > 0
+    assert delta[5] > 0
+    np.testing.assert_allclose(delta[[0, 1, 4]], 0)
@@ -0,0 +1,18 @@
+import numpy as np
+
+from anomaly_pipeline import FEATURES_BY_SCORE, JOINT, load_company, prepare_indicator
+from healthy_periods import healthy_masks
+
+
+def test_joint_thresholds_calibrated_on_each_indicator_healthy_quarters(panel):
+    frames = {company: load_company(panel, company) for company in sorted(panel["company"].unique())}
+    healthy = healthy_masks(frames, "quantile", None)
+    for company, df_company in frames.items():
+        job = prepare_indicator(df_company, JOINT, seed=0, backend="numpy", healthy=healthy[company])
+        fitted = {tuple(row) for row in job["X_tr"]}
+        for indicator, rows in zip(FEATURES_BY_SCORE, job["calibration_rows"]):
+            # the indicator's healthy quarters the joint model was not fitted on, more than the few validation rows
+            assert healthy[company][indicator].values[rows].all()
+            assert not fitted & {tuple(row) for row in job["X_full"][rows]}
+            assert len(rows) > len(job["X_val"])
+            assert len(rows) == healthy[company][indicator].sum() - len(job["X_tr"])
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from latent_map import density_grid
+
+
+def test_density_grid_per_bank_and_pair_of_dims():
+    rng = np.random.default_rng(0)
+    frames = []
+    for indicator, n_dims in [("profitability", 2), ("joint", 4)]:
+        for company in ["Bank A", "Bank B"]:
+            df_model = pd.DataFrame({"company": company, "indicator": indicator, "is_anomaly": rng.random(30) < 0.1})
+            for k in range(n_dims):
+                df_model[f"latent{k + 1}"] = rng.normal(size=30)
+            frames.append(df_model)
+    grid = density_grid(pd.concat(frames, ignore_index=True), bins=5)
+
+    pairs = grid.groupby("indicator")[["x_dim", "y_dim"]].apply(lambda df: len(df.drop_duplicates()))
+    assert pairs.to_dict() == {"joint": 6, "profitability": 1}
+    # every quarter of every bank lands in one cell of each pair
+    totals = grid.groupby(["indicator", "x_dim", "y_dim", "company"])["count"].sum()
+    assert (totals == 30).all()
@@ -0,0 +1,29 @@
+from anomaly_pipeline import FEATURES_BY_SCORE, fit_companies_numpy, load_company
+from model_registry import ModelRegistry
+
+
+def test_cache_hit_reuses_the_registered_version(tmp_path, panel):
+    frames = {company: load_company(panel, company) for company in sorted(panel["company"].unique())}
+    for _ in range(2):
+        fit_companies_numpy(frames, seed=0, registry_dir=str(tmp_path / "registry"), cache_dir=str(tmp_path / "cache"))
+
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    for company in frames:
+        for score in FEATURES_BY_SCORE:
+            assert registry.versions(company, score) == [1]
+            assert registry.load(company, score)["training_key"] is not None
+
+
+def test_cache_hit_registers_when_latest_version_differs(tmp_path, panel):
+    # a model fitted on other data became the latest version: the cached one is registered again
+    frames = {company: load_company(panel, company) for company in sorted(panel["company"].unique())}
+    registry_dir, cache_dir = str(tmp_path / "registry"), str(tmp_path / "cache")
+    fit_companies_numpy(frames, seed=0, registry_dir=registry_dir, cache_dir=cache_dir)
+    shifted = {company: frame.assign(score_profitability_local=frame["score_profitability_local"] / 2)
+               for company, frame in frames.items()}
+    fit_companies_numpy(shifted, ["profitability"], seed=0, registry_dir=registry_dir, cache_dir=cache_dir)
+    fit_companies_numpy(frames, ["profitability"], seed=0, registry_dir=registry_dir, cache_dir=cache_dir)
+
+    registry = ModelRegistry(registry_dir)
+    for company in frames:
+        assert registry.versions(company, "profitability") == [1, 2, 3]
@@ -0,0 +1,25 @@
+import numpy as np
+
+from anomaly_pipeline import FEATURES_BY_SCORE, fit_companies_numpy, load_company
+from model_registry import ModelRegistry
+from online_scorer import OnlineScorer
+
+
+def test_online_quarter_scored_like_training(tmp_path, newest_first_panel):
+    # models trained from a newest-first file, then its newest quarter arrives online
+    company = "Bank A"
+    df_company = load_company(newest_first_panel, company)
+    fit_companies_numpy({company: df_company.iloc[:-1]}, seed=0, registry_dir=str(tmp_path / "registry"), cache_dir=None)
+    registry = ModelRegistry(str(tmp_path / "registry"))
+
+    scorer = OnlineScorer(registry, str(tmp_path / "results"))
+    history = newest_first_panel[newest_first_panel["company"] == company].iloc[1:]
+    scorer.prime(history)
+    last = df_company.iloc[-1]
+    df_new = scorer.ingest(company, last["date"], last, append=False)
+
+    for score, features in FEATURES_BY_SCORE.items():
+        # same delta as the training frame, so the same error as scoring that row in batch
+        assert df_new[features[1]].iloc[0] == last[features[1]]
+        mse, _ = registry.score(company, score, last[features].to_numpy(dtype=float))
+        np.testing.assert_allclose(df_new[f"reconstruction_error_{score}"].iloc[0], mse[0])
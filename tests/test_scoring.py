@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from feature_store import load_dataset
+from ingest import FLOAT_COLUMNS
+from scoring import RATIOS, load_scores, score_panel, write_scores
+
+
+def notebook_scores(df):
+    # cells of score_global_local.ipynb, in their order
+    df = df.copy()
+    for ratio in RATIOS:
+        df[f"{ratio}_pct"] = df.groupby("company")[ratio].rank(pct=True)
+    df["score_profitability_local"] = df[["ROA_pct", "ROE_pct", "net_margin_pct"]].mean(axis=1)
+    df["score_liquidity_local"] = df[["current_ratio_pct", "cash_ratio_pct"]].mean(axis=1)
+    df["score_solvency_local"] = 1 - df["debt_to_equity_pct"]
+    df["inv_debt_pct"] = 1 - df["debt_to_equity_pct"]
+    df["score_leverage_adjusted_local"] = df[["ROE_pct", "inv_debt_pct"]].mean(axis=1)
+    for ratio in RATIOS:
+        df[f"{ratio}_pct_global"] = df.groupby("quarter")[ratio].rank(pct=True)
+    df["debt_to_equity_pct_global"] = 1 - df["debt_to_equity_pct_global"]
+    df["score_profitability_global"] = df[["ROA_pct_global", "ROE_pct_global", "net_margin_pct_global"]].mean(axis=1)
+    df["score_liquidity_global"] = df[["current_ratio_pct_global", "cash_ratio_pct_global"]].mean(axis=1)
+    df["score_solvency_global"] = df["debt_to_equity_pct_global"]
+    df["score_leverage_adjusted_global"] = df[["ROE_pct_global", "debt_to_equity_pct_global"]].mean(axis=1)
+    return df
+
+
+def test_score_panel_matches_the_notebook():
+    # coarse values (many ties) and missing ratios, as in the real data
+    rng = np.random.default_rng(0)
+    n_rows = 300
+    df = pd.DataFrame({"company": rng.choice(["A", "B", "C", "D", "E"], n_rows),
+                       "quarter": rng.choice([f"q{i}" for i in range(20)], n_rows)})
+    for ratio in RATIOS:
+        df[ratio] = np.where(rng.random(n_rows) < 0.1, np.nan, rng.integers(0, 8, n_rows))
+
+    pd.testing.assert_frame_equal(score_panel(df), notebook_scores(df), check_dtype=False)
+
+
+def test_scores_store_keeps_the_values_of_the_text(tmp_path):
+    # dataset_unified.csv layout -> typed ingest -> scores store: the values the status rules compare
+    # with their thresholds (revenue growth exactly at the 0.1 "boost" bound) come back unchanged
+    rng = np.random.default_rng(0)
+    n_rows = 40
+    dates = pd.date_range("2015-03-31", periods=n_rows // 2, freq="QE").strftime("%Y-%m-%d")
+    df = pd.DataFrame({"company": np.repeat(["A", "B"], n_rows // 2), "date": np.tile(dates, 2)})
+    df["quarter"] = pd.to_datetime(df["date"]).dt.to_period("Q").astype(str)
+    for column in FLOAT_COLUMNS:
+        df[column] = rng.integers(0, 100, n_rows) / 100
+    df.loc[::3, "revenue_growth"] = 0.1
+    csv_path = tmp_path / "dataset_unified.csv"
+    df.to_csv(csv_path, sep=";", decimal=",", index=False)
+
+    write_scores(load_dataset(str(csv_path)), str(tmp_path / "scores_store"))
+    stored = load_scores(str(tmp_path / "scores_store")).sort_values(["company", "date"]).reset_index(drop=True)
+    expected = score_panel(df.assign(date=pd.to_datetime(df["date"])))
+    numeric = [column for column in expected.columns if pd.api.types.is_float_dtype(expected[column])]
+    pd.testing.assert_frame_equal(stored[numeric], expected[numeric], check_exact=True)
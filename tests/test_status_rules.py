@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+from status_rules import SCORES, global_status, local_status
+
+# Row-by-row originals of pages 2 and 3, the reference of the compiled rules.
+
+
+def get_local_status(row, thresholds_dynamic):
+    red, green = 0, 0
+    indicators = {
+        "score_profitability": row.get("score_profitability_local"),
+        "score_liquidity": row.get("score_liquidity_local"),
+        "score_solvency": row.get("score_solvency_local"),
+        "score_leverage_adjusted": row.get("score_leverage_adjusted_local")
+    }
+
+    available = [val for val in indicators.values() if pd.notna(val)]
+    if len(available) < 3:
+        return "Insufficient Data"
+
+    for key, value in indicators.items():
+        if pd.notna(value):
+            if value < thresholds_dynamic[key]["low"]:
+                red += 1
+            elif value > thresholds_dynamic[key]["high"]:
+                green += 1
+
+    adj_leverage = indicators["score_leverage_adjusted"]
+    rev = row.get("revenue_growth")
+
+    if adj_leverage is not None and adj_leverage < thresholds_dynamic["score_leverage_adjusted"]["low"]:
+        return "Leveraged Risk"
+    elif adj_leverage is not None and adj_leverage > thresholds_dynamic["score_leverage_adjusted"]["high"] and red == 0 and rev is not None and rev > thresholds_dynamic["revenue_growth"]["boost"]:
+        return "Excellent Health"
+    elif red >= 3:
+        return "Critical Risk"
+    elif red == 2:
+        return "Danger"
+    elif green >= 2 and red == 0:
+        return "Strong"
+    elif green > 0 and red == 0:
+        return "Good signal"
+    elif red == green and red > 0:
+        return "Mixed Risk"
+    elif red == 1 and green == 0:
+        return "Caution"
+    elif all(thresholds_dynamic[k]["low"] <= val <= thresholds_dynamic[k]["high"] for k, val in indicators.items() if pd.notna(val)):
+        return "Stable"
+    else:
+        return "Watch"
+
+
+def get_global_status(row, thresholds_dynamic_global):
+    red, green = 0, 0
+    indicators = {
+        "score_profitability": row.get("score_profitability_global"),
+        "score_liquidity": row.get("score_liquidity_global"),
+        "score_solvency": row.get("score_solvency_global"),
+        "score_leverage_adjusted": row.get("score_leverage_adjusted_global")
+    }
+
+    available = [val for val in indicators.values() if pd.notna(val)]
+    if len(available) < 3:
+        return "Insufficient Data"
+
+    for key, value in indicators.items():
+        if pd.notna(value):
+            if value < thresholds_dynamic_global[key]["low"]:
+                red += 1
+            elif value > thresholds_dynamic_global[key]["high"]:
+                green += 1
+
+    if red >= 3:
+        return "Critical Risk"
+    elif red == 2:
+        return "Danger"
+    elif green >= 2 and red == 0:
+        return "Strong"
+    elif green > 0 and red == 0:
+        return "Good signal"
+    elif red == green and red > 0:
+        return "Mixed Risk"
+    elif red == 1 and green == 0:
+        return "Caution"
+    elif all(thresholds_dynamic_global[k]["low"] <= val <= thresholds_dynamic_global[k]["high"] for k, val in indicators.items() if pd.notna(val)):
+        return "Stable"
+    else:
+        return "Watch"
+
+
+def random_panel(n_rows, rng):
+    # scores on a coarse grid (many values exactly on a threshold) with missing values, as in the real data
+    df = pd.DataFrame({"company": "bank", "quarter": "q"}, index=range(n_rows))
+    for scope in ["local", "global"]:
+        for score in SCORES:
+            values = rng.integers(0, 11, n_rows) / 10
+            values[rng.random(n_rows) < 0.15] = np.nan
+            df[f"score_{score}_{scope}"] = values
+    df["revenue_growth"] = np.where(rng.random(n_rows) < 0.1, np.nan, rng.integers(-3, 4, n_rows) / 10)
+    return df
+
+
+def random_thresholds(rng, revenue=False):
+    thresholds = {}
+    for score in SCORES:
+        low, high = np.sort(rng.integers(0, 11, 2) / 10)
+        thresholds[f"score_{score}"] = {"low": low, "high": high}
+    if revenue:
+        thresholds["revenue_growth"] = {"drop": -0.1, "boost": 0.1}
+    return thresholds
+
+
+def test_rules_match_the_row_by_row_statuses():
+    # same status as the row-by-row functions on random panels and thresholds
+    rng = np.random.default_rng(0)
+    for trial in range(50):
+        df = random_panel(500, rng)
+        thresholds_local, thresholds_global = random_thresholds(rng, revenue=True), random_thresholds(rng)
+        expected_local = df.apply(get_local_status, axis=1, args=(thresholds_local,)).to_numpy()
+        expected_global = df.apply(get_global_status, axis=1, args=(thresholds_global,)).to_numpy()
+        assert (local_status(df, thresholds_local) == expected_local).all(), f"local status differs (trial {trial})"
+        assert (global_status(df, thresholds_global) == expected_global).all(), f"global status differs (trial {trial})"
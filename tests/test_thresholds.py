@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import MIN_BOOTSTRAP_ERRORS, bootstrap_threshold, build_errors_frame
+
+
+def test_no_borderline_flag_from_a_handful_of_errors(panel):
+    rng = np.random.default_rng(0)
+    df_company = panel[panel["company"] == "Bank A"].assign(delta_profitability=0.0)
+    mse = rng.exponential(size=len(df_company))
+
+    few = rng.exponential(size=MIN_BOOTSTRAP_ERRORS - 1)
+    threshold, threshold_ci = bootstrap_threshold(few, seed=0)
+    assert threshold == np.percentile(few, 95) and threshold_ci is None
+    df_errors = build_errors_frame(df_company, "profitability", mse, threshold, threshold_ci)
+    assert "is_borderline_profitability" not in df_errors.columns
+
+    threshold, threshold_ci = bootstrap_threshold(rng.exponential(size=MIN_BOOTSTRAP_ERRORS), seed=0)
+    assert threshold_ci[0] <= threshold <= threshold_ci[1]
+    df_errors = build_errors_frame(df_company, "profitability", mse, threshold, threshold_ci)
+    assert pd.api.types.is_bool_dtype(df_errors["is_borderline_profitability"])
@@ -0,0 +1,22 @@
+import pandas as pd
+import pytest
+
+from anomaly_pipeline import FEATURES_BY_SCORE
+from healthy_periods import STRATEGIES
+from model_registry import company_slug
+from train_all import train_companies
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_matrix_path_runs_under_every_healthy_strategy(tmp_path, panel, strategy):
+    companies = sorted(panel["company"].unique())
+    output_dir = tmp_path / "out"
+    train_companies(panel, companies, str(output_dir), registry_dir=str(tmp_path / "registry"), backend="numpy",
+                    cache_dir=None, seed=0, healthy_strategy=strategy, healthy_cache_dir=None,
+                    matrix_dir=str(tmp_path / "matrix"))
+
+    healthy = pd.read_csv(output_dir / "healthy_periods.csv")
+    assert len(healthy) == len(panel)
+    assert healthy[[f"healthy_{score}" for score in FEATURES_BY_SCORE]].any().all()
+    for company in companies:
+        assert (output_dir / f"anomaly_results_{company_slug(company)}.csv").exists()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from anomaly_pipeline import FEATURES_BY_SCORE, fit_ensemble_numpy, load_company, prepare_indicator, window_rows
+
+
+def test_windows_of_a_newest_first_panel(panel, newest_first_panel):
+    company, window = "Bank A", 4
+    df_company = load_company(newest_first_panel, company)
+    job = prepare_indicator(df_company, "profitability", backend="numpy", window=window)
+    expected = prepare_indicator(load_company(panel, company), "profitability", backend="numpy", window=window)
+    np.testing.assert_allclose(job["X_full"], expected["X_full"])
+
+    # the row of quarter t holds quarters t-3..t oldest first, the first rows are padded with the oldest quarter
+    raw = df_company[FEATURES_BY_SCORE["profitability"]].values
+    rows = window_rows(raw, window)
+    assert df_company["date"].iloc[0] == pd.Timestamp(newest_first_panel["date"].min())
+    np.testing.assert_array_equal(rows[10], raw[7:11].ravel())
+    np.testing.assert_array_equal(rows[0], np.tile(raw[0], window))
+
+
+def test_ensemble_uses_the_windows(panel):
+    # one windowed indicator next to the plain ones: two input sizes, each fitted in its own batch
+    company = "Bank A"
+    frames = {company: load_company(panel, company)}
+    windowed, plain = fit_ensemble_numpy(frames, 2, ["profitability", "liquidity"], seed=0, windows={"profitability": 4})
+    unwindowed = fit_ensemble_numpy(frames, 2, ["profitability"], seed=0)[0]
+    assert not np.allclose(windowed["reconstruction_error_profitability"], unwindowed["reconstruction_error_profitability"])
+    for score, df_errors in (("profitability", windowed), ("liquidity", plain)):
+        contributions = df_errors[f"contribution_score_{score}"] + df_errors[f"contribution_delta_{score}"]
+        np.testing.assert_allclose(contributions, df_errors[f"reconstruction_error_{score}"])